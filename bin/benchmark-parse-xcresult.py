@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Benchmark parse-xcresult.py on synthetic test trees, without Xcode.
+
+Cases:
+  json-loads        json.load() of the whole document, for reference
+  stream-passing    stream_summary() of a tree where every test passes:
+                    the traversal alone
+  stream-failing    stream_summary() of a tree with --failures failing
+                    test runs: traversal plus failure extraction
+  format-<format>   write the failing tree's report in every --format
+
+Both trees come from generate-xcresult-fixture.py with the same --seed,
+so every run does the same work. Each case runs in a fresh subprocess so
+its peak RSS is its own, repeating until it takes at least MIN_SECONDS.
+
+Usage:
+    python3 bin/benchmark-parse-xcresult.py                 # 100k node trees
+    python3 bin/benchmark-parse-xcresult.py --nodes 1e4,1e5,1e6 --cases stream-failing
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BIN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SIZES = [100_000]
+SEED = 1
+DEFAULT_FAILURES = 0.05
+MIN_SECONDS = 0.5
+
+CASES = ["json-loads", "stream-passing", "stream-failing",
+         "format-text", "format-json", "format-junit"]
+
+
+def load_script(name: str):
+    """Import a bin/ script, whose file name is not a module name."""
+    spec = importlib.util.spec_from_file_location(
+        name.replace("-", "_"), os.path.join(BIN_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_fixtures(nodes: int, failures: float, tmp_dir: str) -> dict:
+    """Passing and failing trees of about `nodes` nodes; returns their paths and sizes."""
+    gen = load_script("generate-xcresult-fixture")
+    suites = gen.plan_tree(random.Random(f"{SEED}/tree"), nodes,
+                           gen.DEFAULT_PARAMETERIZED, gen.DEFAULT_ARGUMENTS)
+    fixtures = {}
+    for name, rate in (("passing", 0.0), ("failing", failures)):
+        path = os.path.join(tmp_dir, f"{name}.json")
+        count, failed = gen.write_fixture(path, suites, set(), random.Random(f"{SEED}/run"),
+                                          rate, 0.0)
+        fixtures[name] = {"path": path, "nodes": count, "failed": failed}
+    return fixtures
+
+
+# Each case prepares its input untimed and returns the function to time.
+
+def case_json_loads(px, fixtures: dict):
+    path = fixtures["failing"]["path"]
+
+    def run():
+        with open(path) as f:
+            json.load(f)
+    return run
+
+
+def case_stream(px, fixtures: dict, name: str):
+    path = fixtures[name]["path"]
+
+    def run():
+        with open(path) as f:
+            px.stream_summary(f)
+    return run
+
+
+def case_format(px, fixtures: dict, fmt: str):
+    path = fixtures["failing"]["path"]
+    with open(path) as f:
+        summary = px.stream_summary(f)
+    write = px.FORMATS[fmt]
+
+    def run():
+        with open(os.devnull, "w") as out:
+            write(summary, path, out)
+    return run
+
+
+def setup_case(px, name: str, fixtures: dict):
+    if name == "json-loads":
+        return case_json_loads(px, fixtures)
+    if name.startswith("stream-"):
+        return case_stream(px, fixtures, name.removeprefix("stream-"))
+    return case_format(px, fixtures, name.removeprefix("format-"))
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(name: str, fixtures: dict):
+    """Subprocess entry point: time one case and print its result as JSON."""
+    px = load_script("parse-xcresult")
+    run = setup_case(px, name, fixtures)
+    iterations = 0
+    started = time.perf_counter()
+    while True:
+        run()
+        iterations += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SECONDS:
+            break
+    json.dump({"seconds": elapsed / iterations, "iterations": iterations,
+               "peakRss": peak_rss_bytes()}, sys.stdout)
+
+
+def measure(name: str, fixtures: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", name,
+         "--fixtures", json.dumps(fixtures)],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{result.stderr}")
+    return json.loads(result.stdout)
+
+
+def parse_sizes(value: str) -> list[int]:
+    try:
+        return [int(float(size)) for size in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sizes {value!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark parse-xcresult.py on synthetic test trees.")
+    parser.add_argument("--nodes", type=parse_sizes, default=SIZES,
+                        help="Comma-separated tree sizes in nodes (default: 1e5)")
+    parser.add_argument("--cases",
+                        help="Comma-separated case names (default: all)")
+    parser.add_argument("--failures", type=float, default=DEFAULT_FAILURES,
+                        help=f"Failure rate of the failing tree (default: {DEFAULT_FAILURES})")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--fixtures", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        run_case(args.run_case, json.loads(args.fixtures))
+        return
+    if not 0 <= args.failures <= 1:
+        parser.error("--failures must be between 0 and 1")
+
+    names = args.cases.split(",") if args.cases else CASES
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases {unknown}; choose from {', '.join(CASES)}")
+
+    print(f"{'case':<16} {'nodes':>10} {'failed':>8} {'seconds':>9} {'nodes/s':>12} "
+          f"{'peak RSS':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.nodes:
+            fixtures = write_fixtures(size, args.failures, tmp_dir)
+            for name in names:
+                tree = fixtures["passing" if name == "stream-passing" else "failing"]
+                measured = measure(name, fixtures)
+                print(f"{name:<16} {tree['nodes']:>10} {tree['failed']:>8} "
+                      f"{measured['seconds']:>9.3f} {tree['nodes'] / measured['seconds']:>12,.0f} "
+                      f"{measured['peakRss'] / 2**20:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
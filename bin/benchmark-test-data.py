@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""Benchmark generate-test-data.py and track throughput across runs.
+
+Cases:
+  rows-python, rows-numpy   generate record rows with each backend, no output
+  timestamps                format epoch seconds with iso_timestamp()
+  csv-write                 write pre-generated rows with csv.writer
+  format-<format>           generate and write every --format end to end
+                            (numpy backend when available)
+
+Each case runs in a fresh subprocess so its peak RSS is its own, with a
+fixed seed and --now so every run does the same work. Small cases repeat
+until they take at least MIN_SECONDS. With --history, results are
+appended to that JSON file, and a case fails when its rows/sec falls more
+than --threshold below the median of its last --window runs recorded there
+on the same host and Python version. The exit status is 1 if any case
+fails.
+
+Usage:
+    python3 bin/benchmark-test-data.py                          # 1e4, 1e6 and 1e7 records
+    python3 bin/benchmark-test-data.py --sizes 1e4,1e6 --cases rows-numpy,format-csv.gz
+    python3 bin/benchmark-test-data.py --history bench.json --threshold 0.1 --no-record
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BIN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SIZES = [10_000, 1_000_000, 10_000_000]
+SEED = 1
+NOW = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+MIN_SECONDS = 0.5
+
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_WINDOW = 5
+
+
+def load_generator():
+    """Import generate-test-data.py, whose file name is not a module name."""
+    spec = importlib.util.spec_from_file_location(
+        "generate_test_data", os.path.join(BIN_DIR, "generate-test-data.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def default_segments(gen, records: int) -> list:
+    phases = gen.resolve_phases(gen.DISTRIBUTIONS["default"], NOW)
+    return gen.time_segments(phases, records, random.Random(SEED))
+
+
+# Each case prepares its input untimed and returns the function to time.
+
+def case_rows(gen, backend: str, records: int, tmp_dir: str):
+    segments = default_segments(gen, records)
+
+    def run():
+        for _ in gen.BACKENDS[backend](gen.DISCIPLINES, segments, 0, SEED):
+            pass
+    return run
+
+
+def case_timestamps(gen, records: int, tmp_dir: str):
+    start = int(NOW.timestamp()) - records * 7
+    iso_timestamp = gen.iso_timestamp
+
+    def run():
+        for epoch in range(start, start + records * 7, 7):
+            iso_timestamp(epoch)
+    return run
+
+
+def case_csv_write(gen, records: int, tmp_dir: str):
+    size = min(records, gen.CHUNK_SIZE)
+    rows, _ = next(gen.iter_chunks(gen.DISCIPLINES, default_segments(gen, size), 0, SEED))
+    path = os.path.join(tmp_dir, "rows.csv")
+
+    def run():
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            for first in range(0, records, size):
+                writer.writerows(rows[:records - first])
+    return run
+
+
+def case_format(gen, fmt: str, records: int, tmp_dir: str):
+    backend = "numpy" if gen.np is not None else "python"
+    segments = default_segments(gen, records)
+    path = os.path.join(tmp_dir, f"out.{gen.FORMATS[fmt]}")
+
+    def run():
+        with gen.open_output(path, fmt, records) as writer:
+            gen.write_chunks(writer, gen.BACKENDS[backend](gen.DISCIPLINES, segments, 0, SEED,
+                                                           **gen.backend_options(backend, fmt)))
+    return run
+
+
+def cases(gen) -> dict:
+    """Case name -> (setup function, reason the case can't run or None)."""
+    no_numpy = "needs NumPy" if gen.np is None else None
+    available = {
+        "rows-python": (lambda g, n, d: case_rows(g, "python", n, d), None),
+        "rows-numpy": (lambda g, n, d: case_rows(g, "numpy", n, d), no_numpy),
+        "timestamps": (case_timestamps, None),
+        "csv-write": (case_csv_write, None),
+    }
+    for fmt in gen.FORMATS:
+        missing = "needs zstandard" if fmt == "csv.zst" and gen.zstandard is None else None
+        available[f"format-{fmt}"] = (
+            lambda g, n, d, fmt=fmt: case_format(g, fmt, n, d), missing)
+    return available
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(name: str, records: int):
+    """Subprocess entry point: time one case and print its result as JSON."""
+    gen = load_generator()
+    setup, _ = cases(gen)[name]
+    iterations = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run = setup(gen, records, tmp_dir)
+        started = time.perf_counter()
+        while True:
+            run()
+            iterations += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= MIN_SECONDS:
+                break
+    json.dump({"seconds": elapsed / iterations, "iterations": iterations,
+               "peakRss": peak_rss_bytes()}, sys.stdout)
+
+
+def measure(name: str, records: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", name,
+         "--sizes", str(records)],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} at {records} records failed:\n{result.stderr}")
+    measured = json.loads(result.stdout)
+    measured["rowsPerSec"] = records / measured["seconds"]
+    return measured
+
+
+def host_key() -> str:
+    return f"{platform.node()}/{platform.machine()}/python-{platform.python_version()}"
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BIN_DIR,
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def load_history(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def baseline(history: dict, host: str, key: str, window: int) -> float | None:
+    """Median rows/sec of the last `window` recorded runs of one case on this host."""
+    values = [run["results"][key]["rowsPerSec"] for run in history["runs"]
+              if run["host"] == host and key in run["results"]]
+    return statistics.median(values[-window:]) if values else None
+
+
+def parse_sizes(value: str) -> list[int]:
+    try:
+        return [int(float(size)) for size in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sizes {value!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark generate-test-data.py and track throughput across runs.")
+    parser.add_argument("--sizes", type=parse_sizes, default=SIZES,
+                        help="Comma-separated record counts (default: 1e4,1e6,1e7)")
+    parser.add_argument("--cases",
+                        help="Comma-separated case names (default: all available)")
+    parser.add_argument("--history", metavar="PATH",
+                        help="JSON history file to compare against and append to "
+                             "(default: none)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed throughput drop against the baseline "
+                             f"(default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help=f"Runs the baseline median covers (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--no-record", action="store_true",
+                        help="Compare against the history without appending to it")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        run_case(args.run_case, args.sizes[0])
+        return
+    if not 0 <= args.threshold < 1:
+        parser.error("--threshold must be in [0, 1)")
+    if args.window < 1:
+        parser.error("--window must be at least 1")
+
+    available = cases(load_generator())
+    names = args.cases.split(",") if args.cases else list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"unknown cases {unknown}; choose from {', '.join(available)}")
+
+    history = load_history(args.history) if args.history else {"runs": []}
+    host = host_key()
+    results = {}
+    failures = []
+    print(f"{'case':<20} {'records':>10} {'rows/s':>12} {'peak RSS':>10} "
+          f"{'baseline':>12} {'change':>8}")
+    for name in names:
+        _, missing = available[name]
+        if missing:
+            print(f"{name:<20} skipped: {missing}")
+            continue
+        for records in args.sizes:
+            key = f"{name}@{records}"
+            measured = measure(name, records)
+            results[key] = measured
+            reference = baseline(history, host, key, args.window)
+            change = ""
+            status = ""
+            if reference:
+                ratio = measured["rowsPerSec"] / reference - 1
+                change = f"{ratio:+.1%}"
+                if ratio < -args.threshold:
+                    status = "  REGRESSION"
+                    failures.append(key)
+            print(f"{name:<20} {records:>10} {measured['rowsPerSec']:>12,.0f} "
+                  f"{measured['peakRss'] / 2**20:>8.0f}MB "
+                  f"{f'{reference:,.0f}' if reference else '-':>12} {change:>8}{status}")
+
+    if args.history and not args.no_record and results:
+        history["runs"].append({
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "host": host,
+            "results": results,
+        })
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=2)
+            f.write("\n")
+
+    if failures:
+        print(f"\n{len(failures)} cases regressed more than {args.threshold:.0%}: "
+              f"{', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,26 @@ Extract "interesting" inline scripts from Claude Code session files.
 Usage:
     python3 extract-scripts.py ~/.claude/projects/*/sessions/*.jsonl -o extracted-scripts.md
     python3 extract-scripts.py ~/.claude/projects/ -o extracted-scripts.md  # recursive search
+    python3 extract-scripts.py ~/.claude/projects/ -j 8  # parse with 8 worker processes
+    python3 extract-scripts.py ~/.claude/projects/ --index ~/.cache/extract-scripts.sqlite
 
 Extracts bash/shell tool-use blocks that are longer than a threshold,
 categorizes recurring patterns, and writes a compact markdown report.
+
+With --index, the extracted scripts are kept in a SQLite file between runs.
+Session files only grow, so a re-run parses just the lines appended since
+the last one, plus new files, and writes the report from the index.
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
+import sqlite3
 import sys
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -35,71 +44,327 @@ def find_session_files(paths):
     return files
 
 
-def extract_tool_uses(filepath):
-    """Parse a JSONL session file and extract bash tool-use blocks."""
-    scripts = []
-    line_num = 0
+BASH_TOOLS = ('bash', 'shell', 'execute', 'terminal', 'bash_tool', 'run_command')
 
-    with open(filepath, 'r', errors='replace') as f:
-        for raw_line in f:
-            line_num += 1
-            raw_line = raw_line.strip()
-            if not raw_line:
-                continue
-            try:
-                msg = json.loads(raw_line)
-            except json.JSONDecodeError:
-                continue
+CHUNK_BYTES = 16 * 1024 * 1024  # files are split into tasks of about this size
+IN_FLIGHT_PER_JOB = 4  # queued tasks per worker process
 
-            # Claude Code session messages can have several shapes.
-            # We look for tool_use blocks in any content array we find.
-            content_sources = []
 
-            # Shape 1: {"type": "assistant", "message": {"content": [...]}}
-            if isinstance(msg.get('message'), dict):
-                c = msg['message'].get('content')
-                if isinstance(c, list):
-                    content_sources.append(c)
+def scan_lines(lines):
+    """Yield (line number, tool, command, timestamp) for the bash tool-use
+    blocks in an iterable of JSONL lines; line numbers start at 1."""
+    line_num = 0
+    for raw_line in lines:
+        line_num += 1
+        # Every tool_use block spells out "tool_use"; most lines are
+        # conversation text and can skip json.loads entirely.
+        if '"tool_use"' not in raw_line:
+            continue
+        raw_line = raw_line.strip()
+        if not raw_line:
+            continue
+        try:
+            msg = json.loads(raw_line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(msg, dict):
+            continue
 
-            # Shape 2: {"role": "assistant", "content": [...]}
-            c = msg.get('content')
+        # Claude Code session messages can have several shapes.
+        # We look for tool_use blocks in any content array we find.
+        content_sources = []
+
+        # Shape 1: {"type": "assistant", "message": {"content": [...]}}
+        if isinstance(msg.get('message'), dict):
+            c = msg['message'].get('content')
             if isinstance(c, list):
                 content_sources.append(c)
 
-            # Shape 3: top-level tool_use
-            if msg.get('type') == 'tool_use':
-                content_sources.append([msg])
-
-            for content_list in content_sources:
-                for block in content_list:
-                    if not isinstance(block, dict):
-                        continue
-                    if block.get('type') != 'tool_use':
-                        continue
-
-                    tool_name = (block.get('name') or '').lower()
-                    tool_input = block.get('input', {})
-
-                    # Bash tool: the command is in input.command
-                    if tool_name in ('bash', 'shell', 'execute', 'terminal',
-                                     'bash_tool', 'run_command'):
-                        cmd = tool_input.get('command', '')
-                        if not cmd and isinstance(tool_input, str):
-                            cmd = tool_input
-                        if cmd:
-                            scripts.append({
-                                'file': str(filepath),
-                                'session': filepath.stem,
-                                'line': line_num,
-                                'tool': tool_name,
-                                'command': cmd,
-                                'timestamp': _extract_timestamp(msg),
-                            })
-
-                    # Write/Edit tool: not a "script" but could be interesting
-                    # We skip these for now; focus on executed commands.
-
-    return scripts
+        # Shape 2: {"role": "assistant", "content": [...]}
+        c = msg.get('content')
+        if isinstance(c, list):
+            content_sources.append(c)
+
+        # Shape 3: top-level tool_use
+        if msg.get('type') == 'tool_use':
+            content_sources.append([msg])
+
+        for content_list in content_sources:
+            for block in content_list:
+                if not isinstance(block, dict):
+                    continue
+                if block.get('type') != 'tool_use':
+                    continue
+
+                tool_name = (block.get('name') or '').lower()
+                tool_input = block.get('input', {})
+
+                # Bash tool: the command is in input.command
+                if tool_name in BASH_TOOLS:
+                    cmd = tool_input.get('command', '') if isinstance(tool_input, dict) else ''
+                    if not cmd and isinstance(tool_input, str):
+                        cmd = tool_input
+                    if cmd:
+                        yield line_num, tool_name, cmd, _extract_timestamp(msg)
+
+                # Write/Edit tool: not a "script" but could be interesting
+                # We skip these for now; focus on executed commands.
+
+
+def script_record(filepath, line, tool, command, timestamp):
+    return {
+        'file': str(filepath),
+        'session': filepath.stem,
+        'line': line,
+        'tool': tool,
+        'command': command,
+        'timestamp': timestamp,
+    }
+
+
+def read_range(filepath, start, end):
+    """Yield (byte offset after the line, raw line) for the lines of a file
+    that start at byte offsets in [start, end)."""
+    with open(filepath, 'rb') as f:
+        offset = start
+        if start:
+            # Skip the rest of the line running into the range.
+            f.seek(start - 1)
+            offset += len(f.readline()) - 1
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            yield offset, line
+
+
+def extract_chunk(task):
+    """Process-pool entry point: scan one byte range of a session file.
+
+    Returns (lines read, [(line number within the range, tool, command,
+    timestamp)], byte offset after the last line, length of that line if it
+    has no newline yet) or (None, error message, None, None); only the
+    scripts themselves travel back to the parent.
+    """
+    filepath, start, end = task
+    progress = [0, start, 0]
+
+    def counted(lines):
+        for offset, line in lines:
+            progress[0] += 1
+            progress[1] = offset
+            progress[2] = 0 if line.endswith(b'\n') else len(line)
+            yield line.decode('utf-8', errors='replace')
+
+    try:
+        found = list(scan_lines(counted(read_range(filepath, start, end))))
+    except Exception as e:
+        return None, str(e), None, None
+    lines, end_offset, tail = progress
+    return lines, found, end_offset, tail
+
+
+def chunk_tasks(session_files, starts=None):
+    """(file index, (path, start, end)) tasks of about CHUNK_BYTES each, in order.
+
+    `starts` gives the byte offset to begin each file at (default: 0).
+    """
+    for index, filepath in enumerate(session_files):
+        begin = starts[index][0] if starts else 0
+        try:
+            size = filepath.stat().st_size
+        except OSError:
+            size = begin
+        for start in range(begin, max(size, begin + 1), CHUNK_BYTES):
+            yield index, (str(filepath), start, min(start + CHUNK_BYTES, size))
+
+
+def extract_all(session_files, jobs=None, starts=None):
+    """Yield (file, scripts, error, (offset, lines)) for every session file, in order.
+
+    Files are split into byte ranges that are scanned in a process pool,
+    with at most IN_FLIGHT_PER_JOB tasks per worker queued, so memory stays
+    bounded however many files there are; ranges are merged back in order.
+
+    `starts` optionally gives a (byte offset, lines before it) pair per file
+    to resume an earlier scan from. (offset, lines) is where the file's last
+    complete line ends, so a line still being written is scanned again by
+    the next resumed scan.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    tasks = chunk_tasks(session_files, starts)
+
+    def results():
+        if jobs == 1:
+            for index, task in tasks:
+                yield index, extract_chunk(task)
+            return
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = deque()
+            for index, task in tasks:
+                pending.append((index, pool.submit(extract_chunk, task)))
+                if len(pending) >= jobs * IN_FLIGHT_PER_JOB:
+                    index, future = pending.popleft()
+                    yield index, future.result()
+            while pending:
+                index, future = pending.popleft()
+                yield index, future.result()
+
+    def finished():
+        return session_files[current], scripts, error, (end - tail, line_offset - bool(tail))
+
+    current = None
+    for index, (lines, found, end_offset, chunk_tail) in results():
+        if index != current:
+            if current is not None:
+                yield finished()
+            current, scripts, error = index, [], None
+            end, line_offset = starts[index] if starts else (0, 0)
+            tail = 0
+        if lines is None:
+            error = error or found
+            continue
+        filepath = session_files[index]
+        scripts.extend(script_record(filepath, line_offset + line, tool, command, timestamp)
+                       for line, tool, command, timestamp in found)
+        line_offset += lines
+        if lines:
+            end, tail = max(end, end_offset), chunk_tail
+    if current is not None:
+        yield finished()
+
+
+INDEX_VERSION = 1
+TAIL_BYTES = 4096  # bytes before a file's indexed offset that must not change
+
+INDEX_SCHEMA = f'''
+DROP TABLE IF EXISTS files;
+DROP TABLE IF EXISTS scripts;
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    tail_hash TEXT NOT NULL
+);
+CREATE TABLE scripts (
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    tool TEXT NOT NULL,
+    command TEXT NOT NULL,
+    timestamp TEXT
+);
+CREATE INDEX scripts_path ON scripts (path, line);
+PRAGMA user_version = {INDEX_VERSION};
+'''
+
+
+def open_index(path):
+    """Open the SQLite index, (re)creating it if it has another version."""
+    db = sqlite3.connect(path)
+    if db.execute('PRAGMA user_version').fetchone()[0] != INDEX_VERSION:
+        db.executescript(INDEX_SCHEMA)
+    return db
+
+
+def tail_hash(filepath, offset):
+    """Hash of the TAIL_BYTES before `offset`, to tell an append from a rewrite."""
+    with open(filepath, 'rb') as f:
+        f.seek(max(offset - TAIL_BYTES, 0))
+        return hashlib.sha1(f.read(min(offset, TAIL_BYTES))).hexdigest()
+
+
+def update_index(db, session_files, jobs=None):
+    """Bring the index up to date with the session files; returns (counts, errors).
+
+    Session files only grow, so an indexed file whose size or mtime changed
+    is scanned from its indexed offset on, with line numbers continuing from
+    there, as long as the bytes before that offset are unchanged; otherwise
+    (and for new files) it is scanned in full. Files that failed to scan
+    keep their old rows and are reported in `errors`, keyed by path.
+    """
+    stored = {row[0]: row[1:] for row in db.execute(
+        'SELECT path, size, mtime_ns, offset, lines, tail_hash FROM files')}
+    counts = Counter()
+    errors = {}
+    todo, starts, stats = [], [], []
+    for sf in session_files:
+        path = str(sf)
+        try:
+            st = sf.stat()
+        except OSError as e:
+            errors[path] = str(e)
+            continue
+        row = stored.get(path)
+        start = (0, 0)
+        if row:
+            size, mtime_ns, offset, lines, digest = row
+            if (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+                counts['unchanged'] += 1
+                continue
+            try:
+                if st.st_size >= offset and tail_hash(sf, offset) == digest:
+                    start = (offset, lines)
+            except OSError:
+                pass
+        counts['appended' if start[0] else 'parsed'] += 1
+        todo.append(sf)
+        starts.append(start)
+        stats.append(st)
+
+    with db:
+        for index, (sf, scripts, error, (offset, lines)) in enumerate(
+                extract_all(todo, jobs, starts)):
+            path = str(sf)
+            if not error:
+                try:
+                    digest = tail_hash(sf, offset)
+                except OSError as e:
+                    error = str(e)
+            if error:
+                errors[path] = error
+                continue
+            # Rows past the resumed line come from a line that was still
+            # being written; it has just been scanned again.
+            db.execute('DELETE FROM scripts WHERE path = ? AND line > ?',
+                       (path, starts[index][1]))
+            db.executemany('INSERT INTO scripts VALUES (?, ?, ?, ?, ?)',
+                           [(path, s['line'], s['tool'], s['command'], s['timestamp'])
+                            for s in scripts])
+            db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)',
+                       (path, stats[index].st_size, stats[index].st_mtime_ns,
+                        offset, lines, digest))
+        for path in stored.keys() - {str(sf) for sf in session_files}:
+            if not os.path.exists(path):
+                db.execute('DELETE FROM files WHERE path = ?', (path,))
+                db.execute('DELETE FROM scripts WHERE path = ?', (path,))
+    return counts, errors
+
+
+def indexed_scripts(index_path, session_files, jobs=None):
+    """Like extract_all(), but only scans what changed since the last run.
+
+    The index at `index_path` keeps every file's extracted scripts; the
+    scripts yielded are read back from it.
+    """
+    db = open_index(index_path)
+    try:
+        counts, errors = update_index(db, session_files, jobs)
+        print(f'Index {index_path}: {counts["unchanged"]} files unchanged, '
+              f'{counts["appended"]} appended to, {counts["parsed"]} parsed in full',
+              file=sys.stderr)
+        for sf in session_files:
+            path = str(sf)
+            if path in errors:
+                yield sf, [], errors[path], None
+                continue
+            rows = db.execute('SELECT line, tool, command, timestamp FROM scripts '
+                              'WHERE path = ? ORDER BY rowid', (path,))
+            yield sf, [script_record(sf, *row) for row in rows], None, None
+    finally:
+        db.close()
 
 
 def _extract_timestamp(msg):
@@ -331,6 +596,11 @@ def main():
                         help=f'Minimum meaningful lines to be "interesting" (default: {MIN_LINES})')
     parser.add_argument('--max-samples', type=int, default=3,
                         help='Max sample scripts per category (default: 3)')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='Worker processes for parsing (default: CPU count)')
+    parser.add_argument('--index', metavar='FILE',
+                        help='SQLite index of extracted scripts to keep between runs; '
+                             'only new files and appended lines are parsed')
     parser.add_argument('--diag', action='store_true',
                         help='Print diagnostic info about file parsing')
 
@@ -349,16 +619,19 @@ def main():
     parse_errors = 0
     files_with_scripts = 0
 
-    for sf in session_files:
-        try:
-            scripts = extract_tool_uses(sf)
-            if scripts:
-                files_with_scripts += 1
-            all_scripts.extend(scripts)
-        except Exception as e:
+    if args.index:
+        results = indexed_scripts(args.index, session_files, args.jobs)
+    else:
+        results = extract_all(session_files, args.jobs)
+    for sf, scripts, error, _ in results:
+        if error:
             parse_errors += 1
             if args.diag:
-                print(f'  Error parsing {sf}: {e}', file=sys.stderr)
+                print(f'  Error parsing {sf}: {error}', file=sys.stderr)
+            continue
+        if scripts:
+            files_with_scripts += 1
+        all_scripts.extend(scripts)
 
     print(f'Extracted {len(all_scripts)} bash invocations '
           f'from {files_with_scripts} sessions '
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Generate merge-import fixtures with known results from a base export.
+
+Settings > Import Training Data (merge mode) skips every record whose
+duplicate key (timestamp to the second, referenceNote, targetNote,
+trainingType) is already stored; see TrainingDataImporter.mergeRecords.
+Starting from a base CSV, this writes variant files whose records are, in
+controlled fractions:
+
+  duplicates        exact copies of base records           -> skipped
+  conflicts         base key, different outcome values     -> skipped (stored record wins)
+  near-duplicates   base timestamp, different notes        -> imported
+
+and a manifest.json with the import summary the app should report when each
+variant is merged into a store that already holds the base file. With
+--shuffle, every variant is also written in random order.
+
+Two streaming passes over the base file: the first builds a hash index of
+its duplicate keys, the second picks base records by selection sampling and
+derives variant records from them, checking new keys against the index.
+Shuffling scatters records over temporary files and shuffles each one in
+memory, so no pass holds a whole file.
+
+Usage:
+    python3 bin/generate-merge-corpus.py base.csv --out-dir merge
+    python3 bin/generate-merge-corpus.py base.csv.gz --out-dir merge --variants 3 \\
+        --duplicates 0.6 --conflicts 0.1 --records 100000 --shuffle --seed 1
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+
+from peach_export import (
+    HEADER, NOTE_NAME_TABLE, NOTE_NUMBER_TABLE, SEMITONES, csv_preamble,
+    interval_target, open_export, parse_iso_timestamp,
+)
+
+# Older exports used "pitchComparison"; the importer reads it as pitchDiscrimination.
+TRAINING_TYPE_KEYS = {"pitchDiscrimination": 0, "pitchComparison": 0, "pitchMatching": 1}
+
+# The app's default note range (36-84), where near-duplicate notes are drawn.
+NOTE_RANGE = range(36, 85)
+
+NEAR_DUPLICATE_ATTEMPTS = 16
+
+SHUFFLE_BUCKET_RECORDS = 1_000_000
+
+
+def duplicate_key(epoch: int, ref: int, target: int, training_type: str) -> int:
+    """TrainingDataImporter's DuplicateKey packed into one int for a compact set."""
+    return (epoch << 15) | (ref << 8) | (target << 1) | TRAINING_TYPE_KEYS[training_type]
+
+
+def iter_records(path: str):
+    """Yield (fields, duplicate key) for every data row of an export file."""
+    with open_export(path) as f:
+        f.readline()
+        reader = csv.reader(f)
+        if next(reader, None) != HEADER:
+            raise ValueError(f"{path}: not a peach-export-format:1 file")
+        for fields in reader:
+            if not fields:
+                continue
+            try:
+                key = duplicate_key(parse_iso_timestamp(fields[1]), int(fields[2]),
+                                    int(fields[4]), fields[0])
+            except (IndexError, KeyError, ValueError):
+                raise ValueError(f"{path}:{reader.line_num + 1}: invalid record; "
+                                 f"run bin/inspect-export.py validate") from None
+            yield fields, key
+
+
+def index_base(path: str) -> tuple[set, int, dict]:
+    """Duplicate keys, record count and per-type unique key counts of the base file."""
+    keys = set()
+    records = 0
+    unique = {"pitchDiscrimination": 0, "pitchMatching": 0}
+    for fields, key in iter_records(path):
+        records += 1
+        if key not in keys:
+            keys.add(key)
+            unique["pitchMatching" if key & 1 else "pitchDiscrimination"] += 1
+    return keys, records, unique
+
+
+def conflict_row(rng: random.Random, fields: list[str]) -> list[str]:
+    """Same duplicate key, different outcome: the stored record must win."""
+    row = list(fields)
+    if TRAINING_TYPE_KEYS[row[0]] == 0:
+        row[8] = f"{-float(row[8]) or 0.1:.1f}"
+        row[9] = "false" if row[9] == "true" else "true"
+    else:
+        row[11] = f"{float(row[11] or 0) + rng.choice((-1, 1)) * rng.uniform(0.5, 10):.1f}"
+    return row
+
+
+def near_duplicate_row(rng: random.Random, fields: list[str], keys: set,
+                       emitted: set) -> list[str]:
+    """Same timestamp and type, notes moved so the duplicate key is new.
+
+    The key must be in neither the base `keys` nor the `emitted` ones, to
+    which it is added.
+    """
+    epoch = parse_iso_timestamp(fields[1])
+    semitones = SEMITONES[fields[6]]
+    candidates = [rng.choice(NOTE_RANGE) for _ in range(NEAR_DUPLICATE_ATTEMPTS)]
+    for ref in candidates + list(range(128)):
+        target = interval_target(ref, semitones)
+        key = duplicate_key(epoch, ref, target, fields[0])
+        if key not in keys and key not in emitted:
+            emitted.add(key)
+            row = list(fields)
+            row[2], row[3] = NOTE_NUMBER_TABLE[ref], NOTE_NAME_TABLE[ref]
+            row[4], row[5] = NOTE_NUMBER_TABLE[target], NOTE_NAME_TABLE[target]
+            return row
+    raise ValueError(f"no free notes for a near-duplicate at {fields[1]}")
+
+
+def category_counts(records: int, duplicates: float, conflicts: float) -> dict:
+    """Exact record counts per category; near-duplicates take the remainder."""
+    n_duplicates = round(records * duplicates)
+    n_conflicts = min(round(records * conflicts), records - n_duplicates)
+    return {"duplicates": n_duplicates, "conflicts": n_conflicts,
+            "nearDuplicates": records - n_duplicates - n_conflicts}
+
+
+def write_variant(base: str, path: str, keys: set, base_records: int, counts: dict,
+                  rng: random.Random) -> dict:
+    """Stream one variant derived from `base` into `path`; returns per-type counts.
+
+    Every base record is picked records // base_records times, plus once more
+    by selection sampling (Knuth's Algorithm S) for the remainder, and each
+    pick draws its category with probability proportional to what is left,
+    so the totals are exact and the output follows the base order.
+    """
+    remaining = dict(counts)
+    per_type = {category: {"pitchDiscrimination": 0, "pitchMatching": 0}
+                for category in counts}
+    records = sum(counts.values())
+    repeats, extra = divmod(records, base_records)
+    emitted = set()
+
+    with open(path, "w", newline="") as f:
+        f.write(csv_preamble())
+        writer = csv.writer(f)
+        for seen, (fields, key) in enumerate(iter_records(base)):
+            picks = repeats
+            if extra and rng.random() * (base_records - seen) < extra:
+                picks += 1
+                extra -= 1
+            for _ in range(picks):
+                left = sum(remaining.values())
+                draw = rng.random() * left
+                for category, count in remaining.items():
+                    if draw < count:
+                        break
+                    draw -= count
+                remaining[category] -= 1
+                per_type[category]["pitchMatching" if key & 1 else "pitchDiscrimination"] += 1
+
+                if category == "duplicates":
+                    writer.writerow(fields)
+                elif category == "conflicts":
+                    writer.writerow(conflict_row(rng, fields))
+                else:
+                    writer.writerow(near_duplicate_row(rng, fields, keys, emitted))
+    return per_type
+
+
+def shuffle_file(src: str, dst: str, rng: random.Random, records: int):
+    """Write the data rows of `src` to `dst` in random order.
+
+    Rows are scattered over temporary files of about SHUFFLE_BUCKET_RECORDS
+    each, which are shuffled one at a time: a uniform shuffle in linear time
+    with bounded memory.
+    """
+    buckets = max(1, -(-records // SHUFFLE_BUCKET_RECORDS))
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(dst))) as tmp_dir:
+        parts = [open(os.path.join(tmp_dir, f"bucket-{k}"), "w+", newline="")
+                 for k in range(buckets)]
+        try:
+            with open(src, newline="") as f:
+                preamble = f.readline() + f.readline()
+                for line in f:
+                    parts[rng.randrange(buckets)].write(line)
+            with open(dst, "w", newline="") as out:
+                out.write(preamble)
+                for part in parts:
+                    part.seek(0)
+                    lines = part.readlines()
+                    rng.shuffle(lines)
+                    out.writelines(lines)
+        finally:
+            for part in parts:
+                part.close()
+
+
+def expected_summary(per_type: dict) -> dict:
+    """ImportSummary of a merge into a store holding the base records."""
+    summary = {}
+    for training_type in ("pitchDiscrimination", "pitchMatching"):
+        name = "pitchDiscriminations" if training_type == "pitchDiscrimination" else "pitchMatchings"
+        summary[f"{name}Imported"] = per_type["nearDuplicates"][training_type]
+        summary[f"{name}Skipped"] = (per_type["duplicates"][training_type]
+                                     + per_type["conflicts"][training_type])
+    summary["parseErrorCount"] = 0
+    return summary
+
+
+def fraction(value: str) -> float:
+    number = float(value)
+    if not 0 <= number <= 1:
+        raise argparse.ArgumentTypeError(f"{value} is not between 0 and 1")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate merge-import fixtures with known results from a base export.")
+    parser.add_argument("base", help="Base export (.csv, .csv.gz or .csv.zst)")
+    parser.add_argument("--out-dir", required=True,
+                        help="Directory for the variant files and manifest.json")
+    parser.add_argument("--variants", type=int, default=1,
+                        help="Number of variant files (default: 1)")
+    parser.add_argument("--records", type=int,
+                        help="Records per variant (default: as many as the base file)")
+    parser.add_argument("--duplicates", type=fraction, default=0.5,
+                        help="Fraction of exact duplicates (default: 0.5)")
+    parser.add_argument("--conflicts", type=fraction, default=0.25,
+                        help="Fraction of same-key records with other values "
+                             "(default: 0.25); near-duplicates make up the rest")
+    parser.add_argument("--shuffle", action="store_true",
+                        help="Also write each variant in random order")
+    parser.add_argument("--seed", type=int,
+                        help="Random seed (default: random)")
+    args = parser.parse_args()
+
+    if args.duplicates + args.conflicts > 1:
+        parser.error("--duplicates and --conflicts must add up to at most 1")
+    if args.variants < 1:
+        parser.error("--variants must be at least 1")
+    if args.records is not None and args.records < 1:
+        parser.error("--records must be at least 1")
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(32)
+    try:
+        keys, base_records, base_unique = index_base(args.base)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not base_records:
+        print(f"Error: {args.base} has no records", file=sys.stderr)
+        sys.exit(1)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    records = args.records or base_records
+    counts = category_counts(records, args.duplicates, args.conflicts)
+    width = len(str(args.variants))
+    entries = []
+    for k in range(1, args.variants + 1):
+        rng = random.Random(f"{seed}/variant/{k}")
+        name = f"variant-{k:0{width}d}.csv"
+        path = os.path.join(args.out_dir, name)
+        try:
+            per_type = write_variant(args.base, path, keys, base_records, counts, rng)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        files = [name]
+        if args.shuffle:
+            shuffled = f"variant-{k:0{width}d}-shuffled.csv"
+            shuffle_file(path, os.path.join(args.out_dir, shuffled), rng, records)
+            files.append(shuffled)
+        summary = expected_summary(per_type)
+        for file in files:
+            entries.append({
+                "file": file,
+                "records": records,
+                **counts,
+                "shuffled": file.endswith("-shuffled.csv"),
+                "expectedMerge": summary,
+                "expectedStoreRecords": len(keys) + counts["nearDuplicates"],
+            })
+        print(f"Written {name}: {counts['duplicates']} duplicates, {counts['conflicts']} "
+              f"conflicts, {counts['nearDuplicates']} near-duplicates")
+
+    manifest = {
+        "base": os.path.abspath(args.base),
+        "baseRecords": base_records,
+        # Merging the base file into an empty store imports one record per key.
+        "baseUniqueKeys": {**base_unique, "total": len(keys)},
+        "duplicateKey": ["timestamp", "referenceNote", "targetNote", "trainingType"],
+        "seed": seed,
+        "variants": entries,
+    }
+    with open(os.path.join(args.out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"Manifest: {os.path.join(args.out_dir, 'manifest.json')} (seed {seed})")
+    print()
+    print("Import the base file, then each variant via: Settings > Import Training Data > Merge")
+
+
+if __name__ == "__main__":
+    main()
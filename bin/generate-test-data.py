@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Generate a CSV file with backdated training data for testing.
 
-Creates training records at multiple time ranges so all bucket types appear:
+By default, creates training records at multiple time ranges so all bucket types appear:
   - 2-3 months ago  -> month buckets (tap to expand into weeks)
   - 2-3 weeks ago   -> week buckets  (tap to expand into days)
   - 2-3 days ago    -> day buckets   (tap to expand into sessions)
@@ -19,55 +19,63 @@ Usage:
     python3 bin/generate-test-data.py                              # 100 records, all disciplines
     python3 bin/generate-test-data.py --discrimination-unison      # 100 discrimination-unison
     python3 bin/generate-test-data.py --count 50 output.csv        # 50 records to custom path
+    python3 bin/generate-test-data.py --count 10000000 --backend numpy  # bulk, needs NumPy
+    python3 bin/generate-test-data.py --count 10000000 --jobs 8 --seed 1 --now 2026-01-01T12:00:00Z
+    python3 bin/generate-test-data.py --count 100000 --simulate    # realistic learner, needs NumPy
+    python3 bin/generate-test-data.py --simulate --users 1000 --out-dir corpus --jobs 8
+    python3 bin/generate-test-data.py --count 10000000 --format csv.gz   # or csv.zst, columnar, npz
+    python3 bin/generate-test-data.py --count 1000000 --distribution multi-year  # or habit, or a JSON file
+    python3 bin/generate-test-data.py --append --count 5000 --now 2026-01-02T12:00:00Z big.csv
+    python3 bin/generate-test-data.py --count 1000000 --faults 0.001 broken.csv  # + broken.csv.faults.jsonl
 
 Then import the CSV in the app via Settings > Import Training Data (merge mode).
 """
 
 import argparse
 import csv
+import gzip
+import hashlib
+import io
+import json
+import math
+import os
 import random
-from datetime import datetime, timedelta, timezone
+import shutil
+import struct
+import sys
+import tempfile
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
 
-METADATA_LINE = "# peach-export-format:1"
-
-HEADER = [
-    "trainingType", "timestamp",
-    "referenceNote", "referenceNoteName",
-    "targetNote", "targetNoteName",
-    "interval", "tuningSystem",
-    "centOffset", "isCorrect",
-    "initialCentOffset", "userCentError",
-]
-
-NOTE_NAMES = [
-    "C", "C#", "D", "D#", "E", "F",
-    "F#", "G", "G#", "A", "A#", "B",
-]
-
-INTERVALS = {
-    0: "P1", 1: "m2", 2: "M2", 3: "m3", 4: "M3", 5: "P4",
-    6: "d5", 7: "P5", 8: "m6", 9: "M6", 10: "m7", 11: "M7", 12: "P8",
-}
-
-NON_UNISON_SEMITONES = [s for s in INTERVALS if s != 0]
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
-def midi_name(note: int) -> str:
-    octave = note // 12 - 1
-    return f"{NOTE_NAMES[note % 12]}{octave}"
+from peach_export import (
+    DISCIPLINES, HEADER, INTERVAL_TARGETS, METADATA_LINE, NOTE_NAME_TABLE,
+    NOTE_NUMBER_TABLE, SEMITONES, TRAINING_TYPES, TUNING_SYSTEMS,
+    csv_preamble, iso_timestamp, parse_iso_timestamp, record_discipline,
+)
 
-
-def iso_timestamp(dt: datetime) -> str:
-    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+CHUNK_SIZE = 65536
 
 
 def random_ref_note() -> int:
     return random.randint(48, 84)
 
 
-def random_interval():
-    semitones = random.choice(NON_UNISON_SEMITONES)
-    return INTERVALS[semitones], semitones
+def random_interval(ref: int) -> tuple[str, int]:
+    """Pick a non-unison interval above `ref`, returned as (abbreviation, target note)."""
+    return random.choice(INTERVAL_TARGETS[ref])
 
 
 def random_cent_offset() -> float:
@@ -83,14 +91,14 @@ def random_user_cent_error() -> float:
     return round(random.uniform(1, 15), 1)
 
 
-def pitch_discrimination_row(timestamp: datetime, cent_offset: float,
+def pitch_discrimination_row(timestamp: int, cent_offset: float,
                              interval_abbrev: str, ref_note: int,
                              target_note: int) -> list:
     return [
         "pitchDiscrimination",
         iso_timestamp(timestamp),
-        str(ref_note), midi_name(ref_note),
-        str(target_note), midi_name(target_note),
+        NOTE_NUMBER_TABLE[ref_note], NOTE_NAME_TABLE[ref_note],
+        NOTE_NUMBER_TABLE[target_note], NOTE_NAME_TABLE[target_note],
         interval_abbrev,
         "equalTemperament",
         f"{cent_offset:.1f}",
@@ -100,14 +108,14 @@ def pitch_discrimination_row(timestamp: datetime, cent_offset: float,
     ]
 
 
-def pitch_matching_row(timestamp: datetime, initial_cent_offset: float,
+def pitch_matching_row(timestamp: int, initial_cent_offset: float,
                        user_cent_error: float, interval_abbrev: str,
                        ref_note: int, target_note: int) -> list:
     return [
         "pitchMatching",
         iso_timestamp(timestamp),
-        str(ref_note), midi_name(ref_note),
-        str(target_note), midi_name(target_note),
+        NOTE_NUMBER_TABLE[ref_note], NOTE_NAME_TABLE[ref_note],
+        NOTE_NUMBER_TABLE[target_note], NOTE_NAME_TABLE[target_note],
         interval_abbrev,
         "equalTemperament",
         "",  # centOffset (pitchMatching doesn't use)
@@ -117,17 +125,14 @@ def pitch_matching_row(timestamp: datetime, initial_cent_offset: float,
     ]
 
 
-def make_row(discipline: str, timestamp: datetime) -> list:
+def make_row(discipline: str, timestamp: int) -> list:
     ref = random_ref_note()
 
     if discipline == "discrimination-unison":
         return pitch_discrimination_row(timestamp, random_cent_offset(), "P1", ref, ref)
 
     elif discipline == "discrimination-interval":
-        abbrev, semitones = random_interval()
-        target = ref + semitones
-        if target > 127:
-            target = ref - semitones
+        abbrev, target = random_interval(ref)
         return pitch_discrimination_row(timestamp, random_cent_offset(), abbrev, ref, target)
 
     elif discipline == "matching-unison":
@@ -135,10 +140,7 @@ def make_row(discipline: str, timestamp: datetime) -> list:
                                   random_user_cent_error(), "P1", ref, ref)
 
     elif discipline == "matching-interval":
-        abbrev, semitones = random_interval()
-        target = ref + semitones
-        if target > 127:
-            target = ref - semitones
+        abbrev, target = random_interval(ref)
         return pitch_matching_row(timestamp, random_initial_cent_offset(),
                                   random_user_cent_error(), abbrev, ref, target)
 
@@ -146,57 +148,1274 @@ def make_row(discipline: str, timestamp: datetime) -> list:
         raise ValueError(f"Unknown discipline: {discipline}")
 
 
-def generate_timestamps(count: int) -> list[datetime]:
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    timestamps = []
+def sorted_uniform(count: int, low: float, high: float):
+    """Yield `count` uniform samples from [low, high) in ascending order.
+
+    Draws the order statistics directly instead of sorting, so memory stays
+    constant no matter how many samples are requested.
+    """
+    current = 1.0
+    for remaining in range(count, 0, -1):
+        current *= random.random() ** (1.0 / remaining)
+        yield low + (high - low) * (1.0 - current)
 
-    # Distribute into 4 time buckets proportionally
-    month_share = int(count * 0.40)
-    week_share = int(count * 0.30)
-    day_share = int(count * 0.20)
-    today_share = count - month_share - week_share - day_share
 
-    for _ in range(month_share):
-        offset = random.uniform(60, 180)
-        timestamps.append(now - timedelta(days=offset))
+# --- Time distribution ---
+#
+# A distribution is a list of phases, oldest first and non-overlapping. Each
+# phase takes a `share` of the records (shares are relative weights) between
+# `from` and `to`. Times are "now", "today" (midnight UTC), either one minus
+# an offset ("today-3d"), or a bare offset meaning that long before now
+# ("180d"); offsets use the units s, m, h, d, w and y (365 days).
+#
+# Without "sessions", a phase's records are spread uniformly. With it, they
+# arrive in practice sessions: each day is a practice day with probability
+# daysPerWeek / 7 (or the Monday-first `weekdays` probabilities), a practice
+# day has 1 + Poisson(perDay - 1) sessions starting within `hours` (UTC), and
+# a session lasts between half and one and a half times `minutes`. Sessions
+# get records in proportion to their length, i.e. at one constant Poisson
+# rate, and never start within SESSION_GAP of the previous one's end.
+#
+# Phases become (count, start, length) segments: one per uniform phase, one
+# per session. Records are uniform within a segment, and segments are
+# emitted in order, so timestamps come out sorted without a global sort.
 
-    for _ in range(week_share):
-        offset = random.uniform(10, 20)
-        timestamps.append(now - timedelta(days=offset))
+DISTRIBUTIONS = {
+    # The four ranges the module docstring describes.
+    "default": [
+        {"share": 0.4, "from": "180d", "to": "60d"},
+        {"share": 0.3, "from": "20d", "to": "10d"},
+        {"share": 0.2, "from": "today-3d", "to": "today-1d"},
+        {"share": 0.1, "from": "today", "to": "now"},
+    ],
+    # A year of evening practice on most days.
+    "habit": [
+        {"share": 1, "from": "365d", "to": "now",
+         "sessions": {"daysPerWeek": 5, "perDay": 1.3, "hours": [17, 22], "minutes": 20}},
+    ],
+    # Three years of irregular practice, busier at weekends and in the last month.
+    "multi-year": [
+        {"share": 4, "from": "3y", "to": "30d",
+         "sessions": {"weekdays": [0.2, 0.2, 0.2, 0.2, 0.3, 0.7, 0.7], "perDay": 1.5,
+                      "hours": [8, 23], "minutes": 15}},
+        {"share": 1, "from": "30d", "to": "now",
+         "sessions": {"daysPerWeek": 6, "perDay": 2, "hours": [6, 23], "minutes": 25}},
+    ],
+}
 
-    for _ in range(day_share):
-        days_ago = random.choice([2, 3])
-        day_base = today_start - timedelta(days=days_ago)
-        seconds_in_day = random.uniform(0, 86400)
-        timestamps.append(day_base + timedelta(seconds=seconds_in_day))
+TIME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400, "y": 365 * 86400}
 
-    for _ in range(today_share):
-        seconds = random.uniform(0, (now - today_start).total_seconds())
-        timestamps.append(today_start + timedelta(seconds=seconds))
+SESSION_DEFAULTS = {"daysPerWeek": 7, "weekdays": None, "perDay": 1, "hours": [0, 24],
+                    "minutes": 20}
 
-    timestamps.sort()
-    return timestamps
+# StatisticsConfig.sessionGap: records closer than this merge into one session.
+SESSION_GAP = 1800
 
 
-def generate_records(disciplines: list[str], count: int) -> list:
-    timestamps = generate_timestamps(count)
-    rows = []
+def load_distribution(value: str) -> list:
+    """Phases of a DISTRIBUTIONS preset, or of a JSON file ({"phases": [...]} or a list)."""
+    if value in DISTRIBUTIONS:
+        return DISTRIBUTIONS[value]
+    try:
+        with open(value) as f:
+            spec = json.load(f)
+    except OSError as e:
+        raise ValueError(f"not a preset ({', '.join(DISTRIBUTIONS)}) or readable file: {e}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{value}: invalid JSON: {e}")
+    return spec["phases"] if isinstance(spec, dict) and "phases" in spec else spec
+
+
+def resolve_time(value: str, now: float, today: float) -> float:
+    """Epoch seconds of a phase boundary such as "now", "today-3d" or "180d"."""
+    anchor, _, offset = value.partition("-")
+    if anchor not in ("now", "today"):
+        anchor, offset = "now", value
+    base = now if anchor == "now" else today
+    if not offset:
+        return base
+    unit = TIME_UNITS.get(offset[-1:])
+    try:
+        amount = float(offset[:-1])
+    except ValueError:
+        amount = None
+    if unit is None or amount is None:
+        raise ValueError(f"invalid time {value!r}: expected now, today, "
+                         f"[now-|today-]<number><{'|'.join(TIME_UNITS)}>")
+    return base - amount * unit
+
+
+def resolve_phases(phases: list, now: datetime) -> list[tuple]:
+    """Validate a distribution and resolve it to (share, start, end, sessions) tuples."""
+    now_epoch = now.timestamp()
+    today_epoch = now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    if not isinstance(phases, list) or not phases:
+        raise ValueError("a distribution needs a non-empty list of phases")
+
+    resolved = []
+    for n, phase in enumerate(phases, 1):
+        unknown = set(phase) - {"share", "from", "to", "sessions"}
+        if unknown:
+            raise ValueError(f"phase {n}: unknown keys {sorted(unknown)}")
+        if "from" not in phase:
+            raise ValueError(f"phase {n}: missing 'from'")
+        start = resolve_time(phase["from"], now_epoch, today_epoch)
+        end = resolve_time(phase.get("to", "now"), now_epoch, today_epoch)
+        if start > end:
+            raise ValueError(f"phase {n}: 'from' must not be after 'to'")
+        if resolved and start < resolved[-1][2]:
+            raise ValueError(f"phase {n}: overlaps the previous phase; list phases oldest first")
+        if phase.get("share", 1) < 0:
+            raise ValueError(f"phase {n}: share must not be negative")
+
+        sessions = phase.get("sessions")
+        if sessions is not None:
+            unknown = set(sessions) - set(SESSION_DEFAULTS)
+            if unknown:
+                raise ValueError(f"phase {n}: unknown session keys {sorted(unknown)}")
+            sessions = {**SESSION_DEFAULTS, **sessions}
+            if sessions["weekdays"] is None:
+                sessions["weekdays"] = [sessions["daysPerWeek"] / 7] * 7
+            low, high = sessions["hours"]
+            if len(sessions["weekdays"]) != 7 or not 0 <= low < high <= 24:
+                raise ValueError(f"phase {n}: sessions need 7 weekdays and 0 <= hours < 24")
+            if sessions["perDay"] < 1 or sessions["minutes"] <= 0:
+                raise ValueError(f"phase {n}: sessions need perDay >= 1 and minutes > 0")
+        resolved.append((phase.get("share", 1), start, end, sessions))
+
+    if sum(share for share, _, _, _ in resolved) <= 0:
+        raise ValueError("phase shares must not all be zero")
+    return resolved
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Poisson variate by Knuth's multiplication method (fine for small means)."""
+    limit = math.exp(-mean)
+    k, product = 0, rng.random()
+    while product > limit:
+        k += 1
+        product *= rng.random()
+    return k
+
+
+def plan_sessions(rng: random.Random, start: float, end: float, sessions: dict) -> list:
+    """Practice sessions between `start` and `end` as ordered (start, length) pairs."""
+    low, high = sessions["hours"]
+    weekdays = sessions["weekdays"]
+    planned = []
+    previous_end = -float("inf")
+    for day in range(int(start // 86400), int(-(-end // 86400))):
+        # Day 0, 1970-01-01, was a Thursday.
+        if rng.random() >= weekdays[(day + 3) % 7]:
+            continue
+        window = day * 86400 + low * 3600
+        count = 1 + poisson(rng, sessions["perDay"] - 1)
+        for offset in sorted(rng.uniform(0, (high - low) * 3600) for _ in range(count)):
+            session_start = max(window + offset, previous_end + SESSION_GAP, start)
+            length = sessions["minutes"] * 60 * rng.uniform(0.5, 1.5)
+            session_end = min(session_start + length, end)
+            if session_start < session_end:
+                planned.append((session_start, session_end - session_start))
+                previous_end = session_end
+    return planned
+
+
+def time_segments(phases: list[tuple], count: int, rng: random.Random) -> list[tuple]:
+    """Split `count` records over resolved phases as ordered (count, start, length) segments.
+
+    Records are apportioned by cumulative rounding, so counts add up exactly;
+    the work is proportional to the number of phases, days and sessions,
+    not records.
+    """
+    total_share = sum(share for share, _, _, _ in phases)
+    segments = []
+    cumulative = 0
+    assigned = 0
+    for k, (share, start, end, sessions) in enumerate(phases):
+        cumulative += share
+        upto = count if k == len(phases) - 1 else int(count * cumulative / total_share)
+        phase_count, assigned = upto - assigned, upto
+        if not phase_count:
+            continue
+        if sessions is None:
+            segments.append((phase_count, start, end - start))
+            continue
+
+        planned = plan_sessions(rng, start, end, sessions)
+        if not planned:
+            raise ValueError(f"phase {k + 1} has records but no practice sessions; "
+                             f"raise daysPerWeek or widen the phase")
+        total_length = sum(length for _, length in planned)
+        covered = 0.0
+        session_assigned = 0
+        for i, (session_start, length) in enumerate(planned):
+            covered += length
+            upto = (phase_count if i == len(planned) - 1
+                    else round(phase_count * covered / total_length))
+            if upto > session_assigned:
+                segments.append((upto - session_assigned, session_start, length))
+                session_assigned = upto
+    return segments
+
+
+def split_shards(segments: list, jobs: int) -> list[tuple[int, list]]:
+    """Cut ordered segments into `jobs` consecutive shards of near-equal size.
 
-    for i, ts in enumerate(timestamps):
+    A segment that straddles a shard boundary is split proportionally in time,
+    so every shard covers its own contiguous slice of the timeline. Returns
+    (index of the shard's first record, segments) per shard.
+    """
+    total = sum(share for share, _, _ in segments)
+    shards = []
+    for k in range(jobs):
+        lo, hi = total * k // jobs, total * (k + 1) // jobs
+        shard_segments = []
+        offset = 0
+        for share, start, length in segments:
+            first, last = max(lo, offset), min(hi, offset + share)
+            if first < last:
+                shard_segments.append((
+                    last - first,
+                    start + length * (first - offset) / share,
+                    length * (last - first) / share,
+                ))
+            offset += share
+        shards.append((lo, shard_segments))
+    return shards
+
+
+def derive_seed(seed: int, *keys) -> int:
+    """Derive an independent, reproducible seed for one shard or user."""
+    return random.Random("/".join(str(k) for k in (seed, *keys))).getrandbits(63)
+
+
+def iter_timestamps(segments: list):
+    """Yield integer epoch seconds in ascending order across ordered `segments`."""
+    for share, start, length in segments:
+        for seconds in sorted_uniform(share, start, start + length):
+            yield int(seconds)
+
+
+def iter_chunks(disciplines: list[str], segments: list, first_index: int = 0,
+                seed: int | None = None, chunk_size: int = CHUNK_SIZE):
+    """Yield (rows, discipline_counts) in timestamp order, cycling through `disciplines`.
+
+    `first_index` is the global position of the first record, which keeps the
+    discipline cycle continuous across shards.
+    """
+    if seed is not None:
+        random.seed(seed)
+    rows = []
+    counts = {}
+    for i, ts in enumerate(iter_timestamps(segments), first_index):
         discipline = disciplines[i % len(disciplines)]
         rows.append(make_row(discipline, ts))
+        counts[discipline] = counts.get(discipline, 0) + 1
+        if len(rows) == chunk_size:
+            yield rows, counts
+            rows = []
+            counts = {}
+    if rows:
+        yield rows, counts
+
+
+# --- NumPy backend ---
+#
+# Draws whole chunks of records as arrays and formats each column with table
+# lookups, so the per-record cost is a handful of array operations instead of
+# dozens of Python calls. Output matches the pure-Python backend's schema.
+
+def _tenths_table(low: int, high: int):
+    """String table for one-decimal values, indexed by tenths minus `low`."""
+    return np.array([f"{t / 10:.1f}" for t in range(low, high + 1)])
+
+
+def numpy_tables() -> dict:
+    return {
+        "note_str": np.array(NOTE_NUMBER_TABLE),
+        "note_name": np.array(NOTE_NAME_TABLE),
+        "interval_abbrev": np.array([[a for a, _ in row] for row in INTERVAL_TARGETS]),
+        "interval_target": np.array([[t for _, t in row] for row in INTERVAL_TARGETS]),
+        "tenths": _tenths_table(-int(MAX_CENTS * 10), int(MAX_CENTS * 10)),
+    }
+
+
+def numpy_sorted_uniform(rng, count: int, chunk_size: int):
+    """Chunked, vectorized counterpart of sorted_uniform() on [0, 1).
+
+    The running product of sorted_uniform() becomes a cumulative sum of logs
+    that carries over from one chunk to the next.
+    """
+    log_current = 0.0
+    for first in range(0, count, chunk_size):
+        n = min(chunk_size, count - first)
+        remaining = np.arange(count - first, count - first - n, -1)
+        log_steps = np.cumsum(np.log(rng.random(n)) / remaining) + log_current
+        log_current = log_steps[-1]
+        yield -np.expm1(log_steps)
+
+
+def numpy_batch_times(rng, batch: list):
+    """Sorted epoch seconds for several small segments at once.
+
+    A segment's k timestamps are the first k of k + 1 exponential gaps,
+    normalized by their sum (Poisson arrivals conditioned on the count),
+    which are again sorted uniforms; one cumulative sum covers the batch.
+    """
+    counts = np.array([share for share, _, _ in batch])
+    gaps = np.cumsum(rng.exponential(size=int(counts.sum()) + len(batch)))
+    ends = np.cumsum(counts + 1) - 1
+    before = np.concatenate(([0.0], gaps[ends[:-1]]))
+    arrivals = np.ones(len(gaps), dtype=bool)
+    arrivals[ends] = False
+    fractions = ((gaps[arrivals] - np.repeat(before, counts))
+                 / np.repeat(gaps[ends] - before, counts))
+    starts = np.repeat([start for _, start, _ in batch], counts)
+    lengths = np.repeat([length for _, _, length in batch], counts)
+    return np.floor(starts + fractions * lengths).astype(np.int64)
+
+
+def numpy_segment_times(rng, segments: list, chunk_size: int):
+    """Yield sorted epoch-second arrays of at most `chunk_size` across ordered segments.
+
+    Segments of a chunk or more stream through numpy_sorted_uniform();
+    smaller ones, such as practice sessions, are batched into shared chunks.
+    """
+    batch = []
+    batched = 0
+    for segment in segments:
+        share, start, length = segment
+        if batch and (share >= chunk_size or batched + share > chunk_size):
+            yield numpy_batch_times(rng, batch)
+            batch, batched = [], 0
+        if share >= chunk_size:
+            for fractions in numpy_sorted_uniform(rng, share, chunk_size):
+                yield np.floor(start + fractions * length).astype(np.int64)
+        elif share:
+            batch.append(segment)
+            batched += share
+    if batch:
+        yield numpy_batch_times(rng, batch)
+
+
+def numpy_random_values(rng, tables: dict, kinds) -> dict:
+    """Draw one chunk of record values; `kinds` indexes DISCIPLINES."""
+    n = len(kinds)
+    is_interval = (kinds % 2) == 1
+
+    ref = rng.integers(48, 85, n)
+    choice = rng.integers(0, tables["interval_target"].shape[1], n)
+    return {
+        "ref": ref,
+        "target": np.where(is_interval, tables["interval_target"][ref, choice], ref),
+        "abbrev": np.where(is_interval, tables["interval_abbrev"][ref, choice], "P1"),
+        "cents": rng.uniform(1, 25, n) * rng.choice([-1, 1], n),
+        "correct": rng.random(n) < 0.5,
+        "initial": rng.uniform(-20, 20, n),
+        "user_error": rng.uniform(1, 15, n),
+    }
+
+
+def numpy_rows(tables: dict, kinds, epoch_seconds, values: dict):
+    """Format one chunk of record values as CSV rows."""
+    n = len(kinds)
+    is_discrimination = kinds < 2
+
+    def tenths(column):
+        clipped = np.clip(column, -MAX_CENTS, MAX_CENTS)
+        return tables["tenths"][np.rint(clipped * 10).astype(np.int64) + len(tables["tenths"]) // 2]
+
+    timestamps = np.char.add(
+        np.datetime_as_string(epoch_seconds.astype("datetime64[s]"), unit="s"), "Z")
+    ref, target = values["ref"], values["target"]
+
+    columns = [
+        np.where(is_discrimination, "pitchDiscrimination", "pitchMatching"),
+        timestamps,
+        tables["note_str"][ref], tables["note_name"][ref],
+        tables["note_str"][target], tables["note_name"][target],
+        values["abbrev"],
+        np.full(n, "equalTemperament"),
+        np.where(is_discrimination, tenths(values["cents"]), ""),
+        np.where(is_discrimination, np.where(values["correct"], "true", "false"), ""),
+        np.where(is_discrimination, "", tenths(values["initial"])),
+        np.where(is_discrimination, "", tenths(values["user_error"])),
+    ]
+    return list(zip(*(column.tolist() for column in columns)))
+
+
+def numpy_columns(kinds, epoch_seconds, values: dict) -> dict:
+    """One chunk of record values as the numeric COLUMNS ColumnWriter stores.
+
+    The values are those numpy_rows() formats, so columnar output matches
+    the CSV text without going through it.
+    """
+    is_discrimination = kinds < 2
+
+    def tenths(column):
+        # What the one-decimal text reads back as; + 0.0 turns -0.0 into 0.0.
+        return np.rint(np.clip(column, -MAX_CENTS, MAX_CENTS) * 10) / 10 + 0.0
+
+    ref, target = values["ref"], values["target"]
+    return {
+        "trainingType": np.where(is_discrimination, TRAINING_TYPE_CODES["pitchDiscrimination"],
+                                 TRAINING_TYPE_CODES["pitchMatching"]),
+        "timestamp": epoch_seconds,
+        "referenceNote": ref,
+        "targetNote": target,
+        # Targets never fold below the reference from the 48-84 range.
+        "interval": np.abs(target - ref),
+        "tuningSystem": np.full(len(kinds), TUNING_SYSTEM_CODES["equalTemperament"]),
+        "centOffset": np.where(is_discrimination, tenths(values["cents"]), NAN),
+        "isCorrect": np.where(is_discrimination, values["correct"], IS_CORRECT_CODES[""]),
+        "initialCentOffset": np.where(is_discrimination, NAN, tenths(values["initial"])),
+        "userCentError": np.where(is_discrimination, NAN, tenths(values["user_error"])),
+    }
+
+
+# --- Learner simulation ---
+#
+# Each simulated learner has a pitch discrimination threshold per note that
+# shrinks with practice. Discrimination records come from the app's Kazez
+# staircase (see KazezNoteStrategy.swift) run against a 2AFC Weibull
+# psychometric function of that threshold. Every training session is its own
+# staircase chain, and all chains advance together one trial at a time, so the
+# cost per trial is a few array operations however many learners and sessions
+# are simulated.
+
+KAZEZ_NARROWING = 0.05
+KAZEZ_WIDENING = 0.09
+MIN_CENTS = 0.1
+MAX_CENTS = 100.0
+SESSION_TRIALS = 30
+SIMULATION_BATCH = 1024  # corpus users simulated together
+SIMULATION_CHUNK = SESSION_TRIALS * 16  # records per user and simulation step
+PSYCHOMETRIC_SLOPE = 2.0
+
+
+def make_learners(rng, n_users: int, start_epoch: float) -> dict:
+    """Draw per-learner model parameters for `n_users` learners.
+
+    Thresholds fall exponentially from `initial` toward `final` cents, with
+    time constant `tau` seconds counted from `start_epoch`.
+    """
+    notes = np.arange(128)
+    # Thresholds are worst at the edges of the default 36-84 note range.
+    note_shape = 1 + 0.5 * ((notes - 60) / 24) ** 2
+    return {
+        "start": start_epoch,
+        "initial": rng.lognormal(np.log(30), 0.4, n_users),
+        "final": rng.lognormal(np.log(5), 0.4, n_users),
+        "tau": rng.lognormal(np.log(30 * 86400), 0.5, n_users),
+        "note_factor": note_shape * rng.lognormal(0, 0.15, (n_users, 128)),
+        "interval_factor": rng.lognormal(np.log(1.4), 0.2, n_users),
+        "matching_ratio": rng.lognormal(np.log(1.5), 0.3, n_users),
+    }
+
+
+def learner_thresholds(learners: dict, users, epoch_seconds):
+    """Overall discrimination threshold in cents per record, before note factors."""
+    elapsed = np.maximum(epoch_seconds - learners["start"], 0)
+    initial, final = learners["initial"][users], learners["final"][users]
+    return final + (initial - final) * np.exp(-elapsed / learners["tau"][users])
+
+
+def kazez_step(p, correct):
+    """Next cent magnitude after a trial, as in KazezNoteStrategy."""
+    root = np.sqrt(p)
+    step = np.where(correct, p * (1 - KAZEZ_NARROWING * root), p * (1 + KAZEZ_WIDENING * root))
+    return np.clip(step, MIN_CENTS, MAX_CENTS)
+
+
+def run_staircases(rng, thresholds, start):
+    """Run one Kazez staircase per row of `thresholds` (chains x trials).
+
+    `start` is each chain's first cent magnitude. Returns the presented
+    magnitudes and whether each answer was correct, both shaped like
+    `thresholds`.
+    """
+    chains, trials = thresholds.shape
+    magnitudes = np.empty(thresholds.shape)
+    correct = np.empty(thresholds.shape, dtype=bool)
+    p = np.clip(start, MIN_CENTS, MAX_CENTS)
+    for t in range(trials):
+        magnitudes[:, t] = p
+        # 2AFC: chance is 50%, rising toward 100% as p exceeds the threshold.
+        p_correct = 1 - 0.5 * np.exp(-(p / thresholds[:, t]) ** PSYCHOMETRIC_SLOPE)
+        correct[:, t] = rng.random(chains) < p_correct
+        p = kazez_step(p, correct[:, t])
+    return magnitudes, correct
+
+
+def numpy_simulated_values(rng, tables: dict, kinds, epoch_seconds, users,
+                           learners: dict) -> dict:
+    """Replace the random outcome columns with simulated learner behaviour.
+
+    `users` gives each record's learner; the records of one learner must be
+    contiguous. Consecutive records of one learner and discrimination
+    discipline form sessions of SESSION_TRIALS trials; a session never spans
+    chunks. Each session starts near the learner's current threshold, like
+    the app starting from the profile mean. The sessions of all learners
+    run as one batch of staircase chains.
+    """
+    values = numpy_random_values(rng, tables, kinds)
+    is_interval = (kinds % 2) == 1
+    overall = learner_thresholds(learners, users, epoch_seconds)
+    thresholds = overall * learners["note_factor"][users, values["ref"]]
+    thresholds = np.where(is_interval, thresholds * learners["interval_factor"][users], thresholds)
+
+    for kind in (0, 1):
+        rows = np.flatnonzero(kinds == kind)
+        if len(rows) == 0:
+            continue
+        # Position of each record among its learner's records of this kind.
+        owners = users[rows]
+        first = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+        position = np.arange(len(rows)) - np.repeat(first, np.diff(np.r_[first, len(rows)]))
+        trial = position % SESSION_TRIALS
+        chain = np.cumsum(trial == 0) - 1
+        chains = chain[-1] + 1
+        # Padding trials run after a chain's last record and are discarded.
+        padded = np.ones((chains, SESSION_TRIALS))
+        padded[chain, trial] = thresholds[rows]
+        start = padded[:, 0] * rng.lognormal(0, 0.3, chains)
+        magnitudes, correct = run_staircases(rng, padded, start)
+        values["cents"][rows] = magnitudes[chain, trial] * rng.choice([-1, 1], len(rows))
+        values["correct"][rows] = correct[chain, trial]
+
+    values["user_error"] = rng.normal(0, overall * learners["matching_ratio"][users])
+    return values
+
+
+def numpy_iter_chunks(disciplines: list[str], segments: list, first_index: int = 0,
+                      seed: int | None = None, chunk_size: int = CHUNK_SIZE,
+                      learners: dict | None = None, columns: bool = False):
+    """Vectorized counterpart of iter_chunks().
+
+    With `learners`, outcomes are simulated for the first learner instead of
+    drawn uniformly. With `columns`, chunks are numpy_columns() dicts for
+    ColumnWriter instead of CSV rows.
+    """
+    rng = np.random.default_rng(seed)
+    tables = numpy_tables()
+    kinds_cycle = np.array([DISCIPLINES.index(d) for d in disciplines])
+    index = first_index
+    for epoch_seconds in numpy_segment_times(rng, segments, chunk_size):
+        n = len(epoch_seconds)
+        kinds = kinds_cycle[np.arange(index, index + n) % len(kinds_cycle)]
+        index += n
+        if learners is None:
+            values = numpy_random_values(rng, tables, kinds)
+        else:
+            values = numpy_simulated_values(rng, tables, kinds, epoch_seconds,
+                                            np.zeros(n, dtype=np.int64), learners)
+        counts = np.bincount(kinds, minlength=len(DISCIPLINES))
+        yield (numpy_columns(kinds, epoch_seconds, values) if columns
+               else numpy_rows(tables, kinds, epoch_seconds, values),
+               {d: int(c) for d, c in zip(DISCIPLINES, counts) if c})
+
+
+BACKENDS = {
+    "python": iter_chunks,
+    "numpy": numpy_iter_chunks,
+}
+
+
+def backend_options(backend: str, fmt: str, learners: dict | None = None) -> dict:
+    """Keyword arguments for BACKENDS[backend] when writing `fmt`."""
+    options = {"learners": learners} if learners else {}
+    if backend == "numpy" and fmt not in CSV_FORMATS:
+        options["columns"] = True
+    return options
+
+
+def chunk_timestamp(rows, index: int) -> str:
+    """Timestamp of one record of a chunk of CSV rows or numpy_columns()."""
+    if isinstance(rows, dict):
+        return iso_timestamp(int(rows["timestamp"][index]))
+    return rows[index][1]
+
+
+# --- Output formats ---
+#
+# The CSV variants stream through an incremental compressor. Gzip members and
+# zstd frames may be concatenated, so shards compress independently and are
+# joined byte for byte. "columnar" is a directory with one .npy file per
+# numeric column, which np.load(..., mmap_mode="r") maps directly, plus
+# schema.json; "npz" packs the same files into one zip. Writing either needs
+# no NumPy.
+
+FORMATS = {
+    # format: default file extension
+    "csv": "csv",
+    "csv.gz": "csv.gz",
+    "csv.zst": "csv.zst",
+    "columnar": "columns",
+    "npz": "npz",
+}
+
+CSV_FORMATS = {"csv", "csv.gz", "csv.zst"}
+
+COLUMNS = [
+    # (name, array typecode, NumPy dtype)
+    ("trainingType", "B", "u1"),
+    ("timestamp", "q", "i8"),
+    ("referenceNote", "B", "u1"),
+    ("targetNote", "B", "u1"),
+    ("interval", "B", "u1"),
+    ("tuningSystem", "B", "u1"),
+    ("centOffset", "d", "f8"),
+    ("isCorrect", "b", "i1"),
+    ("initialCentOffset", "d", "f8"),
+    ("userCentError", "d", "f8"),
+]
+
+TRAINING_TYPE_CODES = {name: code for code, name in enumerate(TRAINING_TYPES)}
+TUNING_SYSTEM_CODES = {name: code for code, name in enumerate(TUNING_SYSTEMS)}
+IS_CORRECT_CODES = {"true": 1, "false": 0, "": -1}
+NAN = float("nan")
+
+
+def open_csv(path: str, fmt: str):
+    """Open a text stream that writes CSV to `path`, compressed per `fmt`."""
+    if fmt == "csv.gz":
+        return gzip.open(path, "wt", newline="", compresslevel=6)
+    if fmt == "csv.zst":
+        raw = open(path, "wb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), newline="")
+    return open(path, "w", newline="")
+
+
+def compress_bytes(data: bytes, fmt: str) -> bytes:
+    """Compress `data` as one standalone gzip member or zstd frame."""
+    if fmt == "csv.gz":
+        return gzip.compress(data, compresslevel=6)
+    if fmt == "csv.zst":
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def npy_descr(dtype: str) -> str:
+    """Little-endian array protocol type string of a COLUMNS dtype."""
+    return ("|" if dtype.endswith("1") else "<") + dtype
+
+
+def npy_header(dtype: str, length: int) -> bytes:
+    """Version 1.0 .npy header for a 1-d little-endian array of `length` values."""
+    descr = npy_descr(dtype)
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({length},), }}"
+    # Magic, version and length take 10 bytes; the total must align to 64.
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
 
-    return rows
+
+class ColumnWriter:
+    """Write rows as one file per numeric column, with a csv.writer-style writerows().
+
+    With `records`, each file is a .npy array of that length. Without, the
+    files hold bare little-endian values for assemble_columns() to join.
+    Files are only open within writerows(), so any number of writers can
+    be kept at once.
+    """
+
+    def __init__(self, directory: str, records: int | None = None):
+        os.makedirs(directory, exist_ok=True)
+        suffix = ".raw" if records is None else ".npy"
+        self.paths = []
+        for name, _, dtype in COLUMNS:
+            path = os.path.join(directory, name + suffix)
+            with open(path, "wb") as f:
+                if records is not None:
+                    f.write(npy_header(dtype, records))
+            self.paths.append(path)
+
+    def writerows(self, rows):
+        if isinstance(rows, dict):
+            # numpy_columns() from the NumPy backend: already numbers.
+            for path, (name, _, dtype) in zip(self.paths, COLUMNS):
+                with open(path, "ab") as f:
+                    rows[name].astype(npy_descr(dtype)).tofile(f)
+            return
+        columns = [array(typecode) for _, typecode, _ in COLUMNS]
+        (training_type, timestamp, ref, target, interval, tuning_system,
+         cents, correct, initial, user_error) = columns
+        for row in rows:
+            training_type.append(TRAINING_TYPE_CODES[row[0]])
+            timestamp.append(parse_iso_timestamp(row[1]))
+            ref.append(int(row[2]))
+            target.append(int(row[4]))
+            interval.append(SEMITONES[row[6]])
+            tuning_system.append(TUNING_SYSTEM_CODES[row[7]])
+            cents.append(float(row[8]) if row[8] else NAN)
+            correct.append(IS_CORRECT_CODES[row[9]])
+            initial.append(float(row[10]) if row[10] else NAN)
+            user_error.append(float(row[11]) if row[11] else NAN)
+        for path, column in zip(self.paths, columns):
+            if sys.byteorder == "big":
+                column.byteswap()
+            with open(path, "ab") as f:
+                column.tofile(f)
+
+
+class AppendingCSVWriter:
+    """csv.writer-style writerows() onto a CSV output, reopened for every call.
+
+    Compressed formats get a gzip member or zstd frame per call, which
+    readers join, so like ColumnWriter any number can be kept at once.
+    """
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.buffer = io.StringIO(newline="")
+        self.writer = csv.writer(self.buffer)
+        with open(path, "wb") as f:
+            f.write(compress_bytes(csv_preamble().encode(), fmt))
+
+    def writerows(self, rows: list):
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerows(rows)
+        with open(self.path, "ab") as f:
+            f.write(compress_bytes(self.buffer.getvalue().encode(), self.fmt))
+
+
+def write_schema(directory: str, records: int):
+    schema = {
+        "format": METADATA_LINE.lstrip("# "),
+        "records": records,
+        "columns": {name: {"file": name + ".npy", "dtype": dtype}
+                    for name, _, dtype in COLUMNS},
+        "codes": {
+            "trainingType": TRAINING_TYPES,
+            "tuningSystem": TUNING_SYSTEMS,
+            "interval": "semitones",
+            "timestamp": "epoch seconds, UTC",
+            "isCorrect": "1 true, 0 false, -1 empty",
+            "empty floats": "NaN",
+        },
+    }
+    with open(os.path.join(directory, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=2)
+        f.write("\n")
+
+
+def pack_npz(directory: str, path: str):
+    """Zip a columnar directory into an .npz file, one member at a time."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, _, _ in COLUMNS:
+            with open(os.path.join(directory, name + ".npy"), "rb") as src, \
+                    zf.open(name + ".npy", "w", force_zip64=True) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        zf.write(os.path.join(directory, "schema.json"), "schema.json")
+
+
+@contextmanager
+def columnar_output(path: str, fmt: str, records: int):
+    """Yield the directory a columnar or npz output is assembled in."""
+    if fmt == "columnar":
+        yield path
+        write_schema(path, records)
+    else:
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as tmp:
+            yield tmp
+            write_schema(tmp, records)
+            pack_npz(tmp, path)
+
+
+@contextmanager
+def open_output(path: str, fmt: str, records: int):
+    """Yield a writer with writerows() for a complete `records`-row output."""
+    if fmt in CSV_FORMATS:
+        with open_csv(path, fmt) as f:
+            f.write(csv_preamble())
+            yield csv.writer(f)
+    else:
+        with columnar_output(path, fmt, records) as directory:
+            yield ColumnWriter(directory, records)
+
+
+@contextmanager
+def open_appending_output(path: str, fmt: str, records: int):
+    """Like open_output(), but the writer holds no file open between writes."""
+    if fmt in CSV_FORMATS:
+        yield AppendingCSVWriter(path, fmt)
+    else:
+        with columnar_output(path, fmt, records) as directory:
+            yield ColumnWriter(directory, records)
+
+
+@contextmanager
+def open_part(path: str, fmt: str):
+    """Yield a writer for a headerless shard part; see assemble_parts()."""
+    if fmt in CSV_FORMATS:
+        with open_csv(path, fmt) as f:
+            yield csv.writer(f)
+    else:
+        yield ColumnWriter(path)
+
+
+def assemble_columns(path: str, fmt: str, records: int, parts: list[str]):
+    """Join raw column parts into a columnar or npz output, column by column."""
+    with columnar_output(path, fmt, records) as directory:
+        os.makedirs(directory, exist_ok=True)
+        for name, _, dtype in COLUMNS:
+            with open(os.path.join(directory, name + ".npy"), "wb") as out:
+                out.write(npy_header(dtype, records))
+                for part in parts:
+                    with open(os.path.join(part, name + ".raw"), "rb") as src:
+                        shutil.copyfileobj(src, out, 1 << 20)
+
+
+def output_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def file_sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def output_sha256(path: str) -> str | dict:
+    """SHA-256 of an output file, or of each file in a columnar directory."""
+    if os.path.isdir(path):
+        return {name: file_sha256(os.path.join(path, name))
+                for name in sorted(os.listdir(path))}
+    return file_sha256(path)
+
+
+# --- Fault injection ---
+#
+# FaultInjector sits between a record backend and a CSV byte stream and
+# corrupts a random fraction of rows on the way out. The gap to the next
+# faulty row is drawn geometrically, so clean rows still go through one
+# csv.writer call per run and the cost is per fault, not per row. Every fault
+# is listed in a JSON Lines sidecar with its byte offset in the uncompressed
+# stream, its 1-based file line and the row number CSVImportParserV1 reports
+# (data lines after the header), plus the error column the parser should
+# name. Bad UTF-8 and a missing metadata line fail the whole import instead.
+
+FAULT_KINDS = {
+    # kind: column of the expected CSVImportError.invalidRowData, or None if
+    # the whole file is rejected
+    "truncated": "row",
+    "wrong-columns": "row",
+    "note-range": "referenceNote/targetNote",
+    "tuning-system": "tuningSystem",
+    "bad-utf8": None,
+    "missing-metadata": None,
+}
+
+ROW_FAULT_KINDS = [kind for kind in FAULT_KINDS if kind != "missing-metadata"]
+
+BOGUS_TUNING_SYSTEMS = ["wellTempered", "meantone", "pythagorean", "EqualTemperament", ""]
+
+INVALID_UTF8 = [b"\xff", b"\xc3\x28", b"\xed\xa0\x80", b"\xc0\xaf", b"\xe2\x82"]
+
+
+def open_csv_bytes(path: str, fmt: str):
+    """Open a binary stream that writes to `path`, compressed per `fmt`."""
+    if fmt == "csv.gz":
+        return gzip.open(path, "wb", compresslevel=6)
+    if fmt == "csv.zst":
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+    return open(path, "wb")
+
+
+class FaultInjector:
+    """Row writer that corrupts about `rate` of the rows it is given."""
+
+    def __init__(self, out, index, rate: float, kinds: list[str], rng: random.Random):
+        self.out = out
+        self.index = index
+        self.kinds = [kind for kind in kinds if kind in ROW_FAULT_KINDS]
+        self.rng = rng
+        self.log_clean = math.log1p(-rate) if rate < 1 else None
+        self.buffer = io.StringIO(newline="")
+        self.writer = csv.writer(self.buffer)
+        self.offset = 0
+        self.line = 0
+        self.row = 0
+        self.counts = {}
+        self.until_fault = self._gap()
+
+    def _gap(self) -> float:
+        """Clean rows before the next fault: Geometric(rate), or never."""
+        if not self.kinds or self.log_clean == 0:
+            return math.inf
+        if self.log_clean is None:
+            return 0
+        return int(math.log(1.0 - self.rng.random()) / self.log_clean)
+
+    def _emit(self, data: bytes, lines: int):
+        self.out.write(data)
+        self.offset += len(data)
+        self.line += lines
+
+    def _record(self, kind: str, column: str | None, value: str | None = None):
+        entry = {"offset": self.offset, "line": self.line + 1, "row": self.row,
+                 "kind": kind, "column": column}
+        if value is not None:
+            entry["value"] = value
+        self.index.write(json.dumps(entry) + "\n")
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def write_preamble(self, missing_metadata: bool):
+        preamble = csv_preamble()
+        if missing_metadata:
+            self._record("missing-metadata", None)
+            preamble = preamble.split("\n", 1)[1]
+        self._emit(preamble.encode(), preamble.count("\n"))
+
+    def writerows(self, rows: list):
+        start = 0
+        while start < len(rows):
+            clean = min(self.until_fault, len(rows) - start)
+            if clean:
+                self.buffer.seek(0)
+                self.buffer.truncate()
+                self.writer.writerows(rows[start:start + clean])
+                self.row += clean
+                self._emit(self.buffer.getvalue().encode(), clean)
+                start += clean
+                self.until_fault -= clean
+            if start < len(rows):
+                self.row += 1
+                self._inject(rows[start])
+                start += 1
+                self.until_fault = self._gap()
+
+    def _inject(self, row: list):
+        rng = self.rng
+        kind = rng.choice(self.kinds)
+        fields = [str(field) for field in row]
+        line = ",".join(fields)
+        column = FAULT_KINDS[kind]
+        value = None
+
+        if kind == "truncated":
+            # Cut before the last comma so a field is always lost; a cut
+            # inside the last field would just change its value.
+            line = line[:rng.randint(1, line.rfind(","))]
+            value = f"{line.count(',') + 1} fields"
+        elif kind == "wrong-columns":
+            if rng.random() < 0.5:
+                del fields[rng.randrange(len(fields))]
+            else:
+                fields.insert(rng.randrange(len(fields) + 1), "extra")
+            line = ",".join(fields)
+            value = f"{len(fields)} fields"
+        elif kind == "note-range":
+            position = rng.choice((2, 4))
+            column = HEADER[position]
+            fields[position] = str(rng.choice((-1, rng.randint(128, 999))))
+            line = ",".join(fields)
+            value = fields[position]
+        elif kind == "tuning-system":
+            fields[7] = value = rng.choice(BOGUS_TUNING_SYSTEMS)
+            line = ",".join(fields)
+
+        data = line.encode()
+        if kind == "bad-utf8":
+            cut = rng.randrange(len(data) + 1)
+            data = data[:cut] + rng.choice(INVALID_UTF8) + data[cut:]
+        self._record(kind, column, value)
+        self._emit(data + b"\r\n", 1)
+
+
+@contextmanager
+def open_faulty_output(path: str, fmt: str, rate: float, kinds: list[str],
+                       rng: random.Random):
+    """Yield a FaultInjector writing a CSV output and its `<path>.faults.jsonl` index."""
+    with open_csv_bytes(path, fmt) as out, open(path + ".faults.jsonl", "w") as index:
+        writer = FaultInjector(out, index, rate, kinds, rng)
+        writer.write_preamble("missing-metadata" in kinds)
+        yield writer
+
+
+# --- Writing ---
+
+def write_chunks(writer, chunks) -> dict:
+    """Write row chunks to `writer` and return the merged discipline counts."""
+    discipline_counts = {}
+    for rows, counts in chunks:
+        writer.writerows(rows)
+        for key, cnt in counts.items():
+            discipline_counts[key] = discipline_counts.get(key, 0) + cnt
+    return discipline_counts
+
+
+def write_shard(task: tuple) -> tuple[str, dict]:
+    """Process-pool entry point: write one shard's rows to its part file."""
+    backend, disciplines, first_index, segments, seed, options, fmt, path = task
+    with open_part(path, fmt) as writer:
+        counts = write_chunks(writer, BACKENDS[backend](
+            disciplines, segments, first_index, seed, **options))
+    return path, counts
+
+
+def write_sharded(path: str, fmt: str, records: int, backend: str,
+                  disciplines: list[str], shards: list, seed: int, jobs: int,
+                  options: dict, append: bool = False) -> dict:
+    """Generate shards in a process pool and join them into `path` in timestamp order.
+
+    With `append`, CSV shards are added to the end of an existing `path`.
+    """
+    discipline_counts = {}
+    out_dir = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp_dir, \
+            ProcessPoolExecutor(max_workers=jobs) as pool:
+        tasks = [
+            (backend, disciplines, first_index, segments, derive_seed(seed, k), options,
+             fmt, os.path.join(tmp_dir, f"shard-{k}"))
+            for k, (first_index, segments) in enumerate(shards)
+        ]
+        # map() yields in submission order, so CSV shards are appended in
+        # timestamp order while later ones are still being generated.
+        results = pool.map(write_shard, tasks)
+        if fmt in CSV_FORMATS:
+            with open(path, "ab" if append else "wb") as out:
+                if not append:
+                    out.write(compress_bytes(csv_preamble().encode(), fmt))
+                for part, counts in results:
+                    with open(part, "rb") as src:
+                        shutil.copyfileobj(src, out, 1 << 20)
+                    os.remove(part)
+                    for key, cnt in counts.items():
+                        discipline_counts[key] = discipline_counts.get(key, 0) + cnt
+        else:
+            parts = []
+            for part, counts in results:
+                parts.append(part)
+                for key, cnt in counts.items():
+                    discipline_counts[key] = discipline_counts.get(key, 0) + cnt
+            assemble_columns(path, fmt, records, parts)
+    return discipline_counts
+
+
+def learner_subset(learners: dict, first: int, stop: int) -> dict:
+    """Parameters of learners first..stop-1, shaped as a population of their own."""
+    return {key: value if np.isscalar(value) else value[first:stop]
+            for key, value in learners.items()}
+
+
+def write_user_file(task: tuple) -> dict:
+    """Process-pool entry point: write one user's export file.
+
+    Returns the user's manifest entry.
+    """
+    backend, disciplines, phases, count, seed, options, fmt, out_dir, name = task
+    path = os.path.join(out_dir, name)
+    # Every user gets their own practice schedule.
+    segments = time_segments(phases, count, random.Random(derive_seed(seed, "timeline")))
+    records = sum(share for share, _, _ in segments)
+    first = last = None
+
+    def tracked(chunks):
+        nonlocal first, last
+        for rows, counts in chunks:
+            if first is None:
+                first = chunk_timestamp(rows, 0)
+            last = chunk_timestamp(rows, -1)
+            yield rows, counts
+
+    with open_output(path, fmt, records) as writer:
+        counts = write_chunks(writer, tracked(BACKENDS[backend](
+            disciplines, segments, 0, seed, **options)))
+
+    return {
+        "file": name,
+        "records": sum(counts.values()),
+        "firstTimestamp": first,
+        "lastTimestamp": last,
+        "disciplines": dict(sorted(counts.items())),
+        "bytes": output_size(path),
+        "sha256": output_sha256(path),
+    }
+
+
+def simulate_user_batch(task: tuple) -> list[dict]:
+    """Process-pool entry point: simulate a batch of users together.
+
+    Each step takes the next SIMULATION_CHUNK records of every user's
+    timeline and simulates them all in one numpy_simulated_values() pass.
+    The records are then split back into the users' files. Returns the
+    users' manifest entries.
+    """
+    disciplines, phases, count, seed, learners, fmt, out_dir, names, first_user = task
+    tables = numpy_tables()
+    kinds_cycle = np.array([DISCIPLINES.index(d) for d in disciplines])
+    rng = np.random.default_rng(derive_seed(seed, "batch", first_user))
+    streams, records = [], []
+    for user in range(first_user, first_user + len(names)):
+        user_seed = derive_seed(seed, "user", user)
+        # Every user gets their own practice schedule.
+        segments = time_segments(phases, count, random.Random(derive_seed(user_seed, "timeline")))
+        records.append(sum(share for share, _, _ in segments))
+        streams.append(numpy_segment_times(np.random.default_rng(user_seed), segments,
+                                           SIMULATION_CHUNK))
+    index = [0] * len(names)
+    counts = [{} for _ in names]
+    first = [None] * len(names)
+    last = [None] * len(names)
+
+    with ExitStack() as stack:
+        writers = [stack.enter_context(open_appending_output(os.path.join(out_dir, name),
+                                                             fmt, n))
+                   for name, n in zip(names, records)]
+        while True:
+            step = [(k, times) for k, times in
+                    ((k, next(stream, None)) for k, stream in enumerate(streams))
+                    if times is not None]
+            if not step:
+                break
+            kinds = np.concatenate([
+                kinds_cycle[np.arange(index[k], index[k] + len(times)) % len(kinds_cycle)]
+                for k, times in step])
+            epoch_seconds = np.concatenate([times for _, times in step])
+            users = np.repeat([k for k, _ in step], [len(times) for _, times in step])
+            values = numpy_simulated_values(rng, tables, kinds, epoch_seconds, users, learners)
+            offset = 0
+            for k, times in step:
+                part = slice(offset, offset + len(times))
+                user_kinds = kinds[part]
+                user_values = {key: column[part] for key, column in values.items()}
+                if fmt in CSV_FORMATS:
+                    rows = numpy_rows(tables, user_kinds, times, user_values)
+                else:
+                    rows = numpy_columns(user_kinds, times, user_values)
+                writers[k].writerows(rows)
+                if first[k] is None:
+                    first[k] = chunk_timestamp(rows, 0)
+                last[k] = chunk_timestamp(rows, -1)
+                for d, c in zip(DISCIPLINES, np.bincount(user_kinds, minlength=len(DISCIPLINES))):
+                    if c:
+                        counts[k][d] = counts[k].get(d, 0) + int(c)
+                index[k] += len(times)
+                offset += len(times)
+
+    return [{
+        "file": name,
+        "records": sum(counts[k].values()),
+        "firstTimestamp": first[k],
+        "lastTimestamp": last[k],
+        "disciplines": dict(sorted(counts[k].items())),
+        "bytes": output_size(os.path.join(out_dir, name)),
+        "sha256": output_sha256(os.path.join(out_dir, name)),
+    } for k, name in enumerate(names)]
+
+
+def write_corpus(out_dir: str, fmt: str, users: int, backend: str, disciplines: list[str],
+                 phases: list, count: int, seed: int, jobs: int,
+                 learners: dict | None) -> list[dict]:
+    """Write one export file per user in parallel, plus manifest.json.
+
+    Simulated users are split into batches of SIMULATION_BATCH, each
+    simulated together; --jobs runs batches in parallel. Batches and their
+    seeds depend on the user count only, so the corpus does not depend on
+    the job count.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    width = len(str(users))
+    names = [f"user-{user + 1:0{width}d}.{FORMATS[fmt]}" for user in range(users)]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        if learners:
+            tasks = [(disciplines, phases, count, seed,
+                      learner_subset(learners, first, first + SIMULATION_BATCH), fmt, out_dir,
+                      names[first:first + SIMULATION_BATCH], first)
+                     for first in range(0, users, SIMULATION_BATCH)]
+            entries = [entry for batch in pool.map(simulate_user_batch, tasks)
+                       for entry in batch]
+        else:
+            tasks = [(backend, disciplines, phases, count, derive_seed(seed, "user", user),
+                      backend_options(backend, fmt), fmt, out_dir, name)
+                     for user, name in enumerate(names)]
+            entries = list(pool.map(write_user_file, tasks))
+
+    manifest = {
+        "format": METADATA_LINE.lstrip("# "),
+        "fileFormat": fmt,
+        "seed": seed,
+        "simulated": learners is not None,
+        "users": users,
+        "records": sum(e["records"] for e in entries),
+        "files": entries,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return entries
+
+
+def clip_phases(phases: list[tuple], after: float) -> list[tuple]:
+    """The part of resolved phases from `after` on; earlier phases are dropped."""
+    clipped = [(share, max(start, after), end, sessions)
+               for share, start, end, sessions in phases if end > after]
+    if not clipped:
+        raise ValueError("the distribution ends before the existing data does; "
+                         "pass a later --now")
+    return clipped
+
+
+def read_last_line(path: str, block_size: int = 65536) -> str:
+    """Last line of a file, read backwards from the end in blocks."""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        tail = b""
+        while position > 0:
+            position = max(0, position - block_size)
+            f.seek(position)
+            tail = f.read(end - position)
+            # The last line is complete once a newline precedes it.
+            if tail.rstrip(b"\r\n").rfind(b"\n") >= 0:
+                break
+    if not tail.endswith(b"\n"):
+        raise ValueError(f"{path} does not end with a complete row")
+    return tail.rstrip(b"\r\n").rsplit(b"\n", 1)[-1].decode()
+
+
+def existing_export(path: str) -> tuple[int, int, str]:
+    """First and last timestamps and the last record's discipline of a plain CSV export.
+
+    Reads the first three lines and the last line only.
+    """
+    with open(path, newline="") as f:
+        if f.readline().rstrip("\r\n") != METADATA_LINE:
+            raise ValueError(f"{path} has no {METADATA_LINE!r} metadata line")
+        reader = csv.reader(f)
+        if next(reader, None) != HEADER:
+            raise ValueError(f"{path} does not have the export header")
+        first = next(reader, None)
+    if not first:
+        raise ValueError(f"{path} has no records to append to")
+    last = next(csv.reader([read_last_line(path)]))
+    if len(first) != len(HEADER) or len(last) != len(HEADER):
+        raise ValueError(f"{path}: first or last row does not have {len(HEADER)} fields")
+    return (parse_iso_timestamp(first[1]), parse_iso_timestamp(last[1]),
+            record_discipline(last[0], last[6]))
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp; naive values are taken as UTC."""
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Generate CSV test data for Peach training disciplines.")
-    parser.add_argument("output", nargs="?", default="test-data.csv",
-                        help="Output CSV file path (default: test-data.csv)")
+    parser.add_argument("output", nargs="?",
+                        help="Output path (default: test-data.<extension of --format>)")
     parser.add_argument("--count", type=int, default=100,
-                        help="Number of records to generate (default: 100)")
+                        help="Number of records to generate, per user with "
+                             "--out-dir (default: 100)")
     parser.add_argument("--discrimination-unison", action="store_true",
                         help="Generate pitch discrimination unison records")
     parser.add_argument("--discrimination-interval", action="store_true",
@@ -205,8 +1424,61 @@ def main():
                         help="Generate pitch matching unison records")
     parser.add_argument("--matching-interval", action="store_true",
                         help="Generate pitch matching interval records")
+    parser.add_argument("--backend", choices=["python", "numpy"], default="python",
+                        help="Record generator: pure Python, or vectorized NumPy "
+                             "for large counts (default: python)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Generate in N parallel shards (default: 1)")
+    parser.add_argument("--seed", type=int,
+                        help="Random seed; output is reproducible for a given "
+                             "seed, job count and --now (default: random)")
+    parser.add_argument("--now", type=parse_timestamp,
+                        help="Reference time the buckets are relative to, "
+                             "as ISO 8601 (default: current time)")
+    parser.add_argument("--distribution", default="default",
+                        help="Timestamp distribution: a preset "
+                             f"({', '.join(DISTRIBUTIONS)}) or a JSON file of phases "
+                             "(default: default)")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Simulate a learner: Kazez staircase cent offsets and "
+                             "threshold-driven answers (uses the numpy backend)")
+    parser.add_argument("--users", type=int, default=1,
+                        help="Number of users to generate with --out-dir (default: 1)")
+    parser.add_argument("--out-dir",
+                        help="Write one file per user plus manifest.json to this "
+                             "directory; --jobs then parallelizes across users")
+    parser.add_argument("--append", action="store_true",
+                        help="Add --count records after the last one in an existing "
+                             "plain CSV output, reading only its first and last rows")
+    parser.add_argument("--faults", type=float, default=0.0, metavar="RATE",
+                        help="Corrupt this fraction of rows and list every fault in "
+                             "<output>.faults.jsonl (CSV formats, --jobs 1)")
+    parser.add_argument("--fault-kinds", default=",".join(ROW_FAULT_KINDS),
+                        help=f"Comma-separated faults to inject, from {', '.join(FAULT_KINDS)} "
+                             f"(default: all but missing-metadata, which drops the "
+                             f"metadata line once)")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv",
+                        help="Output format: plain CSV for in-app import, compressed "
+                             "CSV, or .npy columns as a directory or npz (default: csv)")
     args = parser.parse_args()
 
+    if args.format == "csv.zst" and zstandard is None:
+        parser.error("--format csv.zst requires zstandard (pip install zstandard)")
+
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    if args.users > 1 and not args.out_dir:
+        parser.error("--users requires --out-dir")
+
+    if args.simulate:
+        args.backend = "numpy"
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    if args.backend == "numpy" and np is None:
+        parser.error("--backend numpy requires NumPy (pip install numpy)")
+
     disciplines = []
     if args.discrimination_unison:
         disciplines.append("discrimination-unison")
@@ -218,35 +1490,101 @@ def main():
         disciplines.append("matching-interval")
 
     if not disciplines:
-        disciplines = ["discrimination-unison", "discrimination-interval",
-                       "matching-unison", "matching-interval"]
+        disciplines = list(DISCIPLINES)
 
-    rows = generate_records(disciplines, args.count)
+    fault_kinds = args.fault_kinds.split(",")
+    unknown = [kind for kind in fault_kinds if kind not in FAULT_KINDS]
+    if unknown:
+        parser.error(f"--fault-kinds: unknown kinds {unknown}")
+    injecting = args.faults > 0 or "missing-metadata" in fault_kinds
+    if not 0 <= args.faults <= 1:
+        parser.error("--faults must be between 0 and 1")
+    if injecting and (args.out_dir or args.append or args.jobs != 1
+                      or args.format not in CSV_FORMATS):
+        parser.error("--faults needs a single CSV output with --jobs 1 "
+                     "(no --out-dir or --append)")
 
-    with open(args.output, "w", newline="") as f:
-        f.write(METADATA_LINE + "\n")
-        writer = csv.writer(f)
-        writer.writerow(HEADER)
-        writer.writerows(rows)
+    if args.append and (args.out_dir or args.format != "csv" or not args.output):
+        parser.error("--append needs the path of an existing plain CSV output "
+                     "(no --out-dir or --format)")
 
-    # Count per discipline
-    discipline_counts = {}
-    for row in rows:
-        training_type = row[0]
-        interval = row[6]
-        if training_type == "pitchDiscrimination" and interval == "P1":
-            key = "discrimination-unison"
-        elif training_type == "pitchDiscrimination":
-            key = "discrimination-interval"
-        elif training_type == "pitchMatching" and interval == "P1":
-            key = "matching-unison"
-        else:
-            key = "matching-interval"
-        discipline_counts[key] = discipline_counts.get(key, 0) + 1
+    seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(32)
+    now = args.now or datetime.now(timezone.utc)
+    try:
+        phases = resolve_phases(load_distribution(args.distribution), now)
+    except (ValueError, KeyError, TypeError) as e:
+        parser.error(f"--distribution {args.distribution}: {e}")
+
+    # Appended records continue the existing timeline, discipline cycle and
+    # learner, but draw from their own seed so they don't repeat the
+    # original's values.
+    first_index = 0
+    stream_seed = seed
+    start_epoch = phases[0][1]
+    if args.append:
+        try:
+            start_epoch, last_epoch, last_discipline = existing_export(args.output)
+            phases = clip_phases(phases, last_epoch + 1)
+        except (OSError, ValueError) as e:
+            parser.error(f"--append: {e}")
+        if last_discipline in disciplines:
+            first_index = disciplines.index(last_discipline) + 1
+        stream_seed = derive_seed(seed, "append", last_epoch)
+    segments = time_segments(phases, args.count,
+                             random.Random(derive_seed(stream_seed, "timeline")))
+
+    learners = None
+    if args.simulate:
+        learners = make_learners(np.random.default_rng(seed), args.users, start_epoch)
+
+    if args.out_dir:
+        entries = write_corpus(args.out_dir, args.format, args.users, args.backend,
+                               disciplines, phases, args.count, seed, args.jobs, learners)
+        total = sum(e["records"] for e in entries)
+        print(f"Written {total} records in {len(entries)} files to {args.out_dir} "
+              f"(seed {seed})")
+        print(f"Manifest: {os.path.join(args.out_dir, 'manifest.json')}")
+        return
+
+    output = args.output or f"test-data.{FORMATS[args.format]}"
+    shards = [(first_index + index, shard_segments)
+              for index, shard_segments in split_shards(segments, args.jobs)]
+    options = backend_options(args.backend, args.format, learners)
+
+    # Rows go straight to disk; only the per-discipline tally is kept.
+    if args.jobs == 1:
+        first_index, segments = shards[0]
+    fault_counts = None
+    if injecting:
+        fault_rng = random.Random(derive_seed(seed, "faults"))
+        with open_faulty_output(output, args.format, args.faults, fault_kinds,
+                                fault_rng) as writer:
+            discipline_counts = write_chunks(writer, BACKENDS[args.backend](
+                disciplines, segments, first_index, derive_seed(stream_seed, 0), **options))
+        fault_counts = writer.counts
+    elif args.jobs == 1 and args.append:
+        with open(output, "a", newline="") as f:
+            discipline_counts = write_chunks(csv.writer(f), BACKENDS[args.backend](
+                disciplines, segments, first_index, derive_seed(stream_seed, 0), **options))
+    elif args.jobs == 1:
+        with open_output(output, args.format, args.count) as writer:
+            discipline_counts = write_chunks(writer, BACKENDS[args.backend](
+                disciplines, segments, first_index, derive_seed(stream_seed, 0), **options))
+    else:
+        discipline_counts = write_sharded(output, args.format, args.count, args.backend,
+                                          disciplines, shards, stream_seed, args.jobs,
+                                          options, append=args.append)
+    total = sum(discipline_counts.values())
 
-    print(f"Written {len(rows)} records to {args.output}")
+    action = "Appended" if args.append else "Written"
+    print(f"{action} {total} records to {output} (seed {seed})")
     for discipline, cnt in sorted(discipline_counts.items()):
         print(f"  {discipline}: {cnt} records")
+    if fault_counts is not None:
+        print(f"Injected {sum(fault_counts.values())} faults, "
+              f"listed in {output}.faults.jsonl")
+        for kind, cnt in sorted(fault_counts.items()):
+            print(f"  {kind}: {cnt}")
     print()
     print("Import via: Settings > Import Training Data > Merge")
 
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Generate synthetic `xcresulttool get test-results tests` JSON.
+
+parse-xcresult.py reads these files in place of a bundle, so its parsing,
+history and report code can be run and profiled without Xcode. The tree
+has the shape xcresulttool reports for Peach: a unit test bundle holding
+test suites of test cases. Parameterized Swift Testing cases get one
+Arguments child per argument; failing cases and arguments get Failure
+Message children.
+
+The tree is fixed by --seed; outcomes are drawn per file, so with
+--bundles every file holds the same tests. A --flaky share of them fails
+about half the time and the rest fail at --failures, which gives
+parse-xcresult.py --history something to find. Files are written one
+suite at a time, with mtimes an hour apart, oldest first.
+
+Usage:
+    python3 bin/generate-xcresult-fixture.py tree.json --nodes 100000
+    python3 bin/generate-xcresult-fixture.py fixtures --bundles 20 --flaky 0.01 --seed 1
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+DEFAULT_NODES = 100_000
+DEFAULT_FAILURES = 0.002
+DEFAULT_SKIPPED = 0.005
+DEFAULT_PARAMETERIZED = 0.1
+DEFAULT_ARGUMENTS = 8
+
+SUITE_SIZES = (3, 40)
+BUNDLE_INTERVAL = 3600
+
+FAILURE_MESSAGES = [
+    "Expectation failed: (abs(error) → {value}) < 1.0",
+    "XCTAssertEqual failed: (\"{value}\") is not equal to (\"0\")",
+    "Issue recorded: timed out after {value} seconds",
+    "Expectation failed: (records.count → {value}) == 0",
+]
+
+
+def plan_tree(rng: random.Random, nodes: int, parameterized: float, arguments: int) -> list:
+    """Suites as (name, [(test name, argument count)]), about `nodes` nodes in all."""
+    suites = []
+    total = 1
+    while total < nodes:
+        k = len(suites)
+        cases = []
+        for c in range(rng.randint(*SUITE_SIZES)):
+            args = rng.randint(2, arguments) if rng.random() < parameterized else 0
+            cases.append((f"test{c:03d}Case{k}({'value:' if args else ''})", args))
+            total += 1 + args
+        suites.append((f"Suite{k:05d}Tests", cases))
+        total += 1
+    return suites
+
+
+def duration(rng: random.Random) -> float:
+    """Log-normal test time: mostly milliseconds, a few seconds-long outliers."""
+    return round(math.exp(rng.gauss(-5, 1.6)), 4)
+
+
+def seconds_node(seconds: float) -> dict:
+    return {"duration": f"{seconds:.2g}s", "durationInSeconds": seconds}
+
+
+def failure_node(rng: random.Random) -> dict:
+    message = rng.choice(FAILURE_MESSAGES).format(value=rng.randint(1, 500))
+    return {"name": f"PeachTests.swift:{rng.randint(10, 900)}: {message}",
+            "nodeType": "Failure Message", "result": "Failed"}
+
+
+def case_node(rng: random.Random, suite: str, name: str, args: int,
+              fail_rate: float, skip_rate: float) -> dict:
+    node = {"name": name, "nodeType": "Test Case",
+            "nodeIdentifier": f"{suite}/{name}",
+            "nodeIdentifierURL": f"test://com.apple.xcode/Peach/PeachTests/{suite}/{name}"}
+    if rng.random() < skip_rate:
+        node["result"] = "Skipped"
+        node.update(seconds_node(0.0))
+        return node
+    children = []
+    failed = False
+    seconds = 0.0
+    if args:
+        for a in range(args):
+            arg_seconds = duration(rng)
+            seconds += arg_seconds
+            arg = {"name": f"value: {a}", "nodeType": "Arguments", "result": "Passed",
+                   **seconds_node(arg_seconds)}
+            if rng.random() < fail_rate:
+                arg["result"] = "Failed"
+                arg["children"] = [failure_node(rng)]
+                failed = True
+            children.append(arg)
+    else:
+        seconds = duration(rng)
+        if rng.random() < fail_rate:
+            children.append(failure_node(rng))
+            failed = True
+    node["result"] = "Failed" if failed else "Passed"
+    node.update(seconds_node(round(seconds, 4)))
+    if children:
+        node["children"] = children
+    return node
+
+
+def write_fixture(path: str, suites: list, flaky: set, rng: random.Random,
+                  failures: float, skipped: float) -> tuple[int, int]:
+    """Write one results document; returns (nodes, failed test cases)."""
+    nodes = 1
+    failed = 0
+    results = []
+    with open(path, "w") as f:
+        f.write('{"devices": [{"deviceName": "iPhone 17", "platform": "iOS Simulator"}], '
+                '"testNodes": [{"name": "PeachTests", "nodeType": "Unit test bundle", '
+                '"children": [')
+        for k, (suite, cases) in enumerate(suites):
+            children = [case_node(rng, suite, name, args,
+                                  0.5 if (suite, name) in flaky else failures, skipped)
+                        for name, args in cases]
+            suite_failed = any(case["result"] == "Failed" for case in children)
+            failed += sum(case["result"] == "Failed" for case in children)
+            nodes += 1 + sum(1 + len(case.get("children", ())) + sum(
+                len(arg.get("children", ())) for arg in case.get("children", ()))
+                for case in children)
+            seconds = round(sum(case["durationInSeconds"] for case in children), 4)
+            suite_node = {"name": suite, "nodeType": "Test Suite", "nodeIdentifier": suite,
+                          "result": "Failed" if suite_failed else "Passed",
+                          **seconds_node(seconds), "children": children}
+            results.append(suite_failed)
+            f.write(", " if k else "")
+            f.write(json.dumps(suite_node))
+        f.write(f'], "result": "{"Failed" if any(results) else "Passed"}"}}], '
+                f'"testPlanConfigurations": [{{"configurationId": "1", '
+                f'"configurationName": "Test Scheme Action"}}]}}\n')
+    return nodes, failed
+
+
+def fraction(value: str) -> float:
+    number = float(value)
+    if not 0 <= number <= 1:
+        raise argparse.ArgumentTypeError(f"{value} is not between 0 and 1")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic xcresulttool test-results JSON.")
+    parser.add_argument("output",
+                        help="Output file, or directory with --bundles")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES,
+                        help=f"Approximate test tree size in nodes (default: {DEFAULT_NODES})")
+    parser.add_argument("--bundles", type=int,
+                        help="Write this many results files into the output directory")
+    parser.add_argument("--failures", type=fraction, default=DEFAULT_FAILURES,
+                        help=f"Failure rate per test run (default: {DEFAULT_FAILURES})")
+    parser.add_argument("--skipped", type=fraction, default=DEFAULT_SKIPPED,
+                        help=f"Share of skipped test cases (default: {DEFAULT_SKIPPED})")
+    parser.add_argument("--flaky", type=fraction, default=0.0,
+                        help="Share of test cases failing half the time (default: 0)")
+    parser.add_argument("--parameterized", type=fraction, default=DEFAULT_PARAMETERIZED,
+                        help="Share of parameterized test cases "
+                             f"(default: {DEFAULT_PARAMETERIZED})")
+    parser.add_argument("--arguments", type=int, default=DEFAULT_ARGUMENTS,
+                        help=f"Most arguments per parameterized case (default: {DEFAULT_ARGUMENTS})")
+    parser.add_argument("--seed", type=int,
+                        help="Random seed (default: random)")
+    args = parser.parse_args()
+
+    if args.nodes < 1:
+        parser.error("--nodes must be at least 1")
+    if args.bundles is not None and args.bundles < 1:
+        parser.error("--bundles must be at least 1")
+    if args.arguments < 2:
+        parser.error("--arguments must be at least 2")
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(32)
+    rng = random.Random(f"{seed}/tree")
+    suites = plan_tree(rng, args.nodes, args.parameterized, args.arguments)
+    flaky = {(suite, name) for suite, cases in suites for name, _ in cases
+             if rng.random() < args.flaky}
+
+    if args.bundles is None:
+        paths = [args.output]
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        width = len(str(args.bundles))
+        paths = [os.path.join(args.output, f"run-{k:0{width}d}.json")
+                 for k in range(1, args.bundles + 1)]
+    now = time.time()
+    try:
+        for k, path in enumerate(paths):
+            nodes, failed = write_fixture(path, suites, flaky, random.Random(f"{seed}/run/{k}"),
+                                          args.failures, args.skipped)
+            mtime = now - (len(paths) - 1 - k) * BUNDLE_INTERVAL
+            os.utime(path, (mtime, mtime))
+            print(f"Written {path}: {nodes} nodes, {failed} failed test cases")
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"{len(flaky)} flaky test cases (seed {seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""Validate and summarize Peach export CSV files.
+
+Reads `peach-export-format:1` files (plain, .gz or .zst) in a single
+streaming pass with constant memory, so multi-GB exports and generated
+fixtures can be checked before importing them into the app.
+
+Subcommands:
+  validate   check the metadata line, header and every row the way the app's
+             importer does, plus note-name consistency and timestamp order;
+             report per-discipline, per-note and per-interval statistics
+  buckets    compute the month/day/session chart buckets the Profile screen
+             would show for each discipline (ProgressTimeline's
+             multi-granularity bucketing), with per-bucket aggregates
+
+Usage:
+    python3 bin/inspect-export.py validate export.csv
+    python3 bin/inspect-export.py validate --json export.csv.gz > stats.json
+    python3 bin/inspect-export.py buckets --now 2026-01-01T12:00:00Z export.csv
+    python3 bin/inspect-export.py buckets --expand --tz Europe/Berlin export.csv
+
+Exit status is 1 if any file has errors.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from peach_export import (
+    HEADER, INTERVALS, METADATA_LINE, METADATA_PREFIX, NOTE_NAME_TABLE, SEMITONES,
+    TRAINING_TYPES, TUNING_SYSTEMS, iso_timestamp, open_export,
+    parse_iso_timestamp, record_discipline,
+)
+
+# Older exports used "pitchComparison"; the importer still accepts it.
+LEGACY_TRAINING_TYPES = {"pitchComparison": "pitchDiscrimination"}
+
+MAX_EXAMPLES = 20
+
+# ProgressTimeline's bucketing parameters (StatisticsConfig.default.sessionGap
+# and ProgressTimeline.dayZoneDays).
+SESSION_GAP = 1800
+DAY_ZONE_DAYS = 7
+SECONDS_PER_DAY = 86400
+
+
+class Accumulator:
+    """Running count, mean and standard deviation (Welford's algorithm)."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: "Accumulator"):
+        """Combine with another accumulator (Chan et al.'s parallel update)."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def population_stdev(self) -> float:
+        """Standard deviation over n, as ProgressTimeline.makeBucket computes it."""
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+    def summary(self) -> dict:
+        return {"count": self.count, "mean": round(self.mean, 3), "stdev": round(self.stdev, 3)}
+
+
+class GroupStats:
+    """Aggregates over one group of records: a discipline, note or interval."""
+
+    __slots__ = ("records", "correct", "cents", "error")
+
+    def __init__(self):
+        self.records = 0
+        self.correct = 0
+        self.cents = Accumulator()
+        self.error = Accumulator()
+
+    def add_discrimination(self, cent_offset: float, is_correct: bool):
+        self.records += 1
+        self.correct += is_correct
+        self.cents.add(abs(cent_offset))
+
+    def add_matching(self, user_cent_error: float):
+        self.records += 1
+        self.error.add(abs(user_cent_error))
+
+    def summary(self) -> dict:
+        summary = {"records": self.records}
+        if self.cents.count:
+            summary["accuracy"] = round(self.correct / self.cents.count, 4)
+            summary["absCentOffset"] = self.cents.summary()
+        if self.error.count:
+            summary["absUserCentError"] = self.error.summary()
+        return summary
+
+
+class RowError(Exception):
+    def __init__(self, column: str, value: str, reason: str):
+        super().__init__(reason)
+        self.column = column
+        self.value = value
+        self.reason = reason
+
+
+def parse_timestamp(value: str) -> int:
+    """Epoch seconds of an export timestamp; other ISO 8601 forms are accepted too."""
+    try:
+        return parse_iso_timestamp(value)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise RowError("timestamp", value, "not a valid ISO 8601 date") from None
+    if dt.tzinfo is None:
+        raise RowError("timestamp", value, "missing time zone")
+    return math.floor(dt.timestamp())
+
+
+def parse_note(column: str, value: str) -> int:
+    if not (value.isascii() and value.isdigit()) or int(value) > 127:
+        raise RowError(column, value, "must be an integer 0-127")
+    return int(value)
+
+
+def parse_number(column: str, value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        raise RowError(column, value, "not a valid number") from None
+
+
+def require_empty(column: str, values: tuple, training_type: str):
+    if any(values):
+        raise RowError(column, ",".join(values), f"must be empty for {training_type} rows")
+
+
+def check_row(fields: list[str]) -> tuple:
+    """Validate one data row; returns (epoch, training type, ref, interval, value, correct).
+
+    Raises RowError for the first problem found, like the app's importer.
+    """
+    if len(fields) != len(HEADER):
+        raise RowError("row", f"{len(fields)} fields", f"expected {len(HEADER)} fields")
+    if any("\ufffd" in field for field in fields):
+        raise RowError("row", "", "invalid UTF-8")
+
+    (training_type, timestamp, ref_str, ref_name, target_str, target_name,
+     interval, tuning_system, cent_offset, is_correct, initial, user_error) = fields
+
+    epoch = parse_timestamp(timestamp)
+    ref = parse_note("referenceNote", ref_str)
+    target = parse_note("targetNote", target_str)
+
+    semitones = SEMITONES.get(interval)
+    if semitones is None:
+        raise RowError("interval", interval, "not a valid interval abbreviation")
+    if tuning_system not in TUNING_SYSTEMS:
+        raise RowError("tuningSystem", tuning_system, "not a valid tuning system")
+
+    # The importer ignores the name columns and the interval arithmetic, but a
+    # mismatch means the writer is broken.
+    if ref_name != NOTE_NAME_TABLE[ref]:
+        raise RowError("referenceNoteName", ref_name, "does not match referenceNote")
+    if target_name != NOTE_NAME_TABLE[target]:
+        raise RowError("targetNoteName", target_name, "does not match targetNote")
+    if target not in (ref + semitones, ref - semitones):
+        raise RowError("targetNote", target_str, "does not match referenceNote and interval")
+
+    training_type = LEGACY_TRAINING_TYPES.get(training_type, training_type)
+    if training_type == "pitchDiscrimination":
+        require_empty("initialCentOffset/userCentError", (initial, user_error), training_type)
+        value = parse_number("centOffset", cent_offset)
+        if is_correct not in ("true", "false"):
+            raise RowError("isCorrect", is_correct, "must be 'true' or 'false'")
+        return epoch, training_type, ref, interval, value, is_correct == "true"
+
+    if training_type == "pitchMatching":
+        require_empty("centOffset/isCorrect", (cent_offset, is_correct), training_type)
+        parse_number("initialCentOffset", initial)
+        value = parse_number("userCentError", user_error)
+        return epoch, training_type, ref, interval, value, None
+
+    raise RowError("trainingType", training_type,
+                   f"must be one of {', '.join(repr(t) for t in TRAINING_TYPES)}")
+
+
+class ExportReport:
+    """Validation results and statistics for one file."""
+
+    def __init__(self, path: str, max_examples: int = MAX_EXAMPLES):
+        self.path = path
+        self.max_examples = max_examples
+        self.fatal = None
+        self.records = 0
+        self.errors = Counter()
+        self.examples = []
+        self.out_of_order = 0
+        self.previous = None
+        self.first = None
+        self.last = None
+        self.disciplines = defaultdict(GroupStats)
+        self.notes = defaultdict(GroupStats)
+        self.intervals = defaultdict(GroupStats)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values()) + (self.fatal is not None)
+
+    def add_error(self, line: int, column: str, value: str, reason: str):
+        self.errors[f"{column}: {reason}"] += 1
+        if len(self.examples) < self.max_examples:
+            self.examples.append({"line": line, "column": column, "value": value,
+                                  "reason": reason})
+
+    def add_record(self, epoch: int, training_type: str, ref: int, interval: str,
+                   value: float, correct: bool | None):
+        self.records += 1
+        if self.previous is not None and epoch < self.previous:
+            self.out_of_order += 1
+        self.previous = epoch
+        self.first = epoch if self.first is None else min(self.first, epoch)
+        self.last = epoch if self.last is None else max(self.last, epoch)
+
+        groups = (self.disciplines[record_discipline(training_type, interval)],
+                  self.notes[ref], self.intervals[SEMITONES[interval]])
+        for group in groups:
+            if correct is None:
+                group.add_matching(value)
+            else:
+                group.add_discrimination(value, correct)
+
+    def summary(self) -> dict:
+        return {
+            "file": self.path,
+            "valid": self.error_count == 0,
+            "fatal": self.fatal,
+            "records": self.records,
+            "errors": self.error_count,
+            "errorKinds": dict(self.errors.most_common()),
+            "errorExamples": self.examples,
+            "outOfOrderTimestamps": self.out_of_order,
+            "firstTimestamp": iso_timestamp(self.first) if self.first is not None else None,
+            "lastTimestamp": iso_timestamp(self.last) if self.last is not None else None,
+            "disciplines": {k: v.summary() for k, v in sorted(self.disciplines.items())},
+            "notes": {NOTE_NAME_TABLE[k]: v.summary() for k, v in sorted(self.notes.items())},
+            "intervals": {INTERVALS[k]: v.summary() for k, v in sorted(self.intervals.items())},
+        }
+
+
+def validate_file(path: str, max_examples: int = MAX_EXAMPLES) -> ExportReport:
+    report = ExportReport(path, max_examples)
+    with open_export(path) as f:
+        metadata = f.readline().rstrip("\r\n")
+        if not metadata.startswith(METADATA_PREFIX):
+            report.fatal = f"missing metadata line (expected {METADATA_LINE!r})"
+            return report
+        if metadata != METADATA_LINE:
+            report.fatal = f"unsupported format metadata {metadata!r}"
+            return report
+
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header != HEADER:
+            report.fatal = f"invalid header: {','.join(header or [])!r}"
+            return report
+
+        for fields in reader:
+            if not fields:
+                continue
+            try:
+                report.add_record(*check_row(fields))
+            except RowError as e:
+                # +1 for the metadata line, which the reader never saw.
+                report.add_error(reader.line_num + 1, e.column, e.value, e.reason)
+    return report
+
+
+def format_group_table(title: str, groups: dict) -> list[str]:
+    lines = [f"{title}:",
+             f"  {'':<24} {'records':>10} {'accuracy':>9} {'|cents|':>8} {'sd':>7}"
+             f" {'|error|':>8} {'sd':>7}"]
+    for key, stats in groups.items():
+        cents = stats.get("absCentOffset")
+        error = stats.get("absUserCentError")
+        accuracy = f"{stats['accuracy']:.1%}" if "accuracy" in stats else "-"
+        lines.append(
+            f"  {key:<24} {stats['records']:>10} {accuracy:>9}"
+            f" {cents['mean'] if cents else '-':>8} {cents['stdev'] if cents else '-':>7}"
+            f" {error['mean'] if error else '-':>8} {error['stdev'] if error else '-':>7}")
+    return lines
+
+
+def format_report(summary: dict) -> str:
+    status = "OK" if summary["valid"] else "INVALID"
+    lines = [f"{summary['file']}: {status}, {summary['records']} valid records, "
+             f"{summary['errors']} errors"]
+    if summary["fatal"]:
+        lines.append(f"  {summary['fatal']}")
+        return "\n".join(lines)
+
+    lines.append(f"  time range: {summary['firstTimestamp']} .. {summary['lastTimestamp']}")
+    lines.append(f"  out-of-order timestamps: {summary['outOfOrderTimestamps']}")
+    for kind, count in summary["errorKinds"].items():
+        lines.append(f"  {count:>10} x {kind}")
+    for example in summary["errorExamples"]:
+        lines.append(f"  line {example['line']}: {example['column']} "
+                     f"{example['value']!r}: {example['reason']}")
+    lines.append("")
+    lines.extend(format_group_table("Per discipline", summary["disciplines"]))
+    lines.extend(format_group_table("Per reference note", summary["notes"]))
+    lines.extend(format_group_table("Per interval", summary["intervals"]))
+    return "\n".join(lines)
+
+
+def cmd_validate(args) -> int:
+    summaries = [validate_file(path, args.max_examples).summary() for path in args.files]
+    if args.json:
+        json.dump(summaries if len(summaries) > 1 else summaries[0], sys.stdout, indent=2)
+        print()
+    else:
+        print("\n\n".join(format_report(s) for s in summaries))
+    return 0 if all(s["valid"] for s in summaries) else 1
+
+
+class LocalCalendar:
+    """Day and month boundaries in one time zone, like Calendar.current.
+
+    Boundaries are the same within a quarter hour of epoch time (every UTC
+    offset is a multiple of 15 minutes). Rows come in time order, so keeping
+    the last quarter hour's boundaries means millions of rows cost a few
+    thousand datetime conversions.
+    """
+
+    def __init__(self, tz=None):
+        self.tz = tz
+        self._key = None
+        self._cached = None
+
+    def boundaries(self, epoch: int) -> tuple[int, int, int, int]:
+        """Start of the day, next day, month and next month containing epoch."""
+        key = epoch // 900
+        cached = self._cached
+        if key != self._key:
+            day = datetime.fromtimestamp(key * 900, self.tz).replace(
+                hour=0, minute=0, second=0, microsecond=0)
+            month = day.replace(day=1)
+            next_month = month.replace(year=month.year + month.month // 12,
+                                       month=month.month % 12 + 1)
+            cached = self._cached = (
+                int(day.timestamp()), int((day + timedelta(days=1)).timestamp()),
+                int(month.timestamp()), int(next_month.timestamp()))
+            self._key = key
+        return cached
+
+    def days_before(self, day_start: int, days: int) -> int:
+        start = datetime.fromtimestamp(day_start, self.tz) - timedelta(days=days)
+        return int(start.timestamp())
+
+    def format(self, epoch: int) -> str:
+        return datetime.fromtimestamp(epoch, self.tz).isoformat()
+
+
+class Bucket:
+    """One chart bucket and its expanded sub-buckets.
+
+    Records are only added to leaves (sessions, and the sub-buckets of day
+    and month buckets); parents merge their children's aggregates once.
+    """
+
+    __slots__ = ("size", "start", "end", "values", "correct", "children", "last_child")
+
+    def __init__(self, size: str, start: int, end: int):
+        self.size = size
+        self.start = start
+        self.end = end
+        self.values = Accumulator()
+        self.correct = 0
+        self.children = {}
+        self.last_child = None
+
+    def merge_children(self):
+        self.children = dict(sorted(self.children.items()))
+        for child in self.children.values():
+            self.values.merge(child.values)
+            self.correct += child.correct
+
+    def summary(self, calendar: LocalCalendar, judged: bool, expand: bool) -> dict:
+        summary = {
+            "size": self.size,
+            "start": calendar.format(self.start),
+            "end": calendar.format(self.end),
+            "records": self.values.count,
+            "mean": round(self.values.mean, 3),
+            "stdev": round(self.values.population_stdev, 3),
+        }
+        if judged:
+            summary["accuracy"] = round(self.correct / self.values.count, 4)
+        if expand and self.children:
+            summary["subBuckets"] = [child.summary(calendar, judged, False)
+                                     for child in self.children.values()]
+        return summary
+
+
+class Timeline:
+    """Buckets for one discipline, as ProgressTimeline.allGranularityBuckets builds them.
+
+    Records from today are grouped into sessions (gaps under SESSION_GAP),
+    the previous DAY_ZONE_DAYS calendar days into days, and everything older
+    into months, the last one truncated where the day zone starts. Month and
+    day buckets also collect the days and sessions subBuckets(expanding:)
+    would return.
+
+    Input is expected in timestamp order, as the app stores it, so most
+    records land in the same leaf as the previous one; `limit` is the first
+    timestamp that no longer does.
+    """
+
+    def __init__(self, calendar: LocalCalendar, now: int):
+        self.calendar = calendar
+        self.session_start = calendar.boundaries(now)[0]
+        self.day_start = calendar.days_before(self.session_start, DAY_ZONE_DAYS)
+        self.buckets = {}
+        self.session = None
+        self.leaf = None
+        self.limit = 0
+
+    def add(self, epoch: int, value: float, correct: bool | None):
+        leaf = self.leaf
+        if leaf is None or not leaf.start <= epoch < self.limit:
+            leaf = self._find_leaf(epoch)
+        elif leaf is self.session:
+            leaf.end = epoch
+            self.limit = epoch + SESSION_GAP
+        elif leaf.size == "session":
+            leaf.end = epoch
+        leaf.values.add(value)
+        if correct:
+            leaf.correct += 1
+
+    def _find_leaf(self, epoch: int) -> Bucket:
+        if epoch >= self.session_start:
+            session = self.session
+            if session is not None and epoch - session.end < SESSION_GAP:
+                session.end = epoch
+            else:
+                session = self._bucket("session", epoch, epoch)
+                self.session = session
+            self.leaf, self.limit = session, session.end + SESSION_GAP
+            return session
+
+        day_start, next_day, month_start, month_end = self.calendar.boundaries(epoch)
+        if epoch >= self.day_start:
+            bucket = self._bucket("day", day_start, day_start + SECONDS_PER_DAY)
+            # subBuckets(expanding:) measures the session gap from the
+            # session's first record, not its last.
+            child = bucket.last_child
+            if child is not None and epoch - child.start < SESSION_GAP:
+                child.end = epoch
+            else:
+                child = bucket.children.get(epoch)
+                if child is None:
+                    child = bucket.children[epoch] = Bucket("session", epoch, epoch)
+                bucket.last_child = child
+            self.leaf, self.limit = child, min(child.start + SESSION_GAP, next_day)
+        else:
+            bucket = self._bucket("month", month_start, min(month_end, self.day_start))
+            child = bucket.children.get(day_start)
+            if child is None:
+                child = bucket.children[day_start] = Bucket(
+                    "day", day_start, day_start + SECONDS_PER_DAY)
+            self.leaf, self.limit = child, next_day
+        return child
+
+    def _bucket(self, size: str, start: int, end: int) -> Bucket:
+        bucket = self.buckets.get((size, start))
+        if bucket is None:
+            bucket = self.buckets[(size, start)] = Bucket(size, start, end)
+        return bucket
+
+    def sorted_buckets(self) -> list[Bucket]:
+        buckets = sorted(self.buckets.values(), key=lambda b: b.start)
+        for bucket in buckets:
+            bucket.merge_children()
+        return buckets
+
+
+def bucket_file(path: str, calendar: LocalCalendar, now: int) -> tuple[dict, Counter, int]:
+    """Stream a file into per-discipline Timelines.
+
+    Only the columns the app's MetricPointMapper reads are parsed; rows that
+    fail to parse are counted and skipped (run `validate` for full checks).
+    """
+    timelines = {}
+    skipped = Counter()
+    out_of_order = 0
+    last = -math.inf
+    with open_export(path) as f:
+        metadata = f.readline().rstrip("\r\n")
+        if metadata != METADATA_LINE:
+            raise ValueError(f"{path}: missing metadata line (expected {METADATA_LINE!r})")
+        if next(csv.reader([f.readline()]), None) != HEADER:
+            raise ValueError(f"{path}: invalid header")
+
+        # The app never quotes fields, so plain lines are split directly;
+        # csv.reader is about three times slower and only needed for quotes.
+        field_count = len(HEADER)
+        minute_prefix, minute = None, 0
+        for line in f:
+            if '"' in line:
+                fields = next(csv.reader([line]), [])
+            else:
+                fields = line.rstrip("\r\n").split(",")
+            if len(fields) != field_count:
+                if fields and fields != [""]:
+                    skipped["wrong field count"] += 1
+                continue
+            training_type, timestamp = fields[0], fields[1]
+            try:
+                # Consecutive records mostly share the minute; only parse the
+                # full timestamp when it changes.
+                if (timestamp[:17] == minute_prefix and len(timestamp) == 20
+                        and timestamp[19] == "Z"):
+                    epoch = minute + int(timestamp[17:19])
+                else:
+                    epoch = parse_timestamp(timestamp)
+                    if len(timestamp) == 20:
+                        minute_prefix, minute = timestamp[:17], epoch - epoch % 60
+                if training_type == "pitchDiscrimination" or training_type == "pitchComparison":
+                    value, correct = abs(float(fields[8])), fields[9] == "true"
+                    key = (True, fields[6] == "P1")
+                elif training_type == "pitchMatching":
+                    value, correct = abs(float(fields[11])), None
+                    key = (False, fields[6] == "P1")
+                else:
+                    skipped["unknown trainingType"] += 1
+                    continue
+            except (RowError, ValueError):
+                skipped["unparseable timestamp or value"] += 1
+                continue
+
+            if epoch < last:
+                out_of_order += 1
+            last = epoch
+            timeline = timelines.get(key)
+            if timeline is None:
+                timeline = timelines[key] = Timeline(calendar, now)
+            timeline.add(epoch, value, correct)
+
+    disciplines = {
+        record_discipline("pitchDiscrimination" if judged else "pitchMatching",
+                          "P1" if unison else ""): timeline
+        for (judged, unison), timeline in timelines.items()}
+    return disciplines, skipped, out_of_order
+
+
+def format_bucket(bucket: dict, indent: str) -> str:
+    accuracy = f"{bucket['accuracy']:.1%}" if "accuracy" in bucket else "-"
+    return (f"{indent}{bucket['size']:<8} {bucket['start']:<26} {bucket['records']:>10}"
+            f" {bucket['mean']:>8} {bucket['stdev']:>7} {accuracy:>9}")
+
+
+def format_buckets(summary: dict) -> str:
+    lines = [f"{summary['file']}: {summary['records']} records, now {summary['now']}",
+             f"  out-of-order timestamps: {summary['outOfOrderTimestamps']}"]
+    for reason, count in summary["skipped"].items():
+        lines.append(f"  {count:>10} rows skipped: {reason}")
+    for discipline, timeline in summary["disciplines"].items():
+        counts = ", ".join(f"{n} {size}" for size, n in timeline["bucketCounts"].items())
+        lines.append("")
+        lines.append(f"{discipline}: {timeline['records']} records in {counts} buckets")
+        lines.append(f"  {'':<8} {'start':<26} {'records':>10} {'mean':>8} {'sd':>7}"
+                     f" {'accuracy':>9}")
+        for bucket in timeline["buckets"]:
+            lines.append(format_bucket(bucket, "  "))
+            for child in bucket.get("subBuckets", []):
+                lines.append(format_bucket(child, "    "))
+    return "\n".join(lines)
+
+
+def cmd_buckets(args) -> int:
+    calendar = LocalCalendar(args.tz)
+    try:
+        timelines, skipped, out_of_order = bucket_file(args.file, calendar, args.now)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    disciplines = {}
+    for discipline, timeline in sorted(timelines.items()):
+        judged = discipline.startswith("discrimination")
+        buckets = timeline.sorted_buckets()
+        disciplines[discipline] = {
+            "records": sum(b.values.count for b in buckets),
+            "bucketCounts": dict(Counter(b.size for b in buckets)),
+            "buckets": [b.summary(calendar, judged, args.expand) for b in buckets],
+        }
+    summary = {
+        "file": args.file,
+        "now": calendar.format(args.now),
+        "records": sum(d["records"] for d in disciplines.values()),
+        "skipped": dict(skipped),
+        "outOfOrderTimestamps": out_of_order,
+        "disciplines": disciplines,
+    }
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_buckets(summary))
+    return 0
+
+
+def now_argument(value: str) -> int:
+    try:
+        return parse_timestamp(value)
+    except RowError as e:
+        raise argparse.ArgumentTypeError(f"{value!r}: {e.reason}") from None
+
+
+def tz_argument(value: str):
+    try:
+        return ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise argparse.ArgumentTypeError(f"unknown time zone {value!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate and summarize Peach export CSV files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    validate = subparsers.add_parser(
+        "validate", help="Check files row by row and print statistics")
+    validate.add_argument("files", nargs="+",
+                          help="Export files (.csv, .csv.gz or .csv.zst)")
+    validate.add_argument("--json", action="store_true",
+                          help="Print the report as JSON")
+    validate.add_argument("--max-examples", type=int, default=MAX_EXAMPLES,
+                          help=f"Error examples to keep per file (default: {MAX_EXAMPLES})")
+    validate.set_defaults(func=cmd_validate)
+
+    buckets = subparsers.add_parser(
+        "buckets", help="Compute the Profile screen's chart buckets per discipline")
+    buckets.add_argument("file", help="Export file (.csv, .csv.gz or .csv.zst)")
+    buckets.add_argument("--now", type=now_argument,
+                         default=math.floor(datetime.now().timestamp()),
+                         help="Reference time as ISO 8601 (default: current time); "
+                              "pass the generator's --now to reproduce its buckets")
+    buckets.add_argument("--tz", type=tz_argument, default=None,
+                         help="IANA time zone for day and month boundaries "
+                              "(default: the system's local time zone)")
+    buckets.add_argument("--expand", action="store_true",
+                         help="Also list each month's days and each day's sessions")
+    buckets.add_argument("--json", action="store_true",
+                         help="Print the buckets as JSON")
+    buckets.set_defaults(func=cmd_buckets)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,128 +1,870 @@
 #!/usr/bin/env python3
-"""Parse xcresult bundle and print failed test details with failure messages."""
+"""Parse xcresult bundle and print failed test details with failure messages.
 
+Instead of a bundle, the script also takes a saved `xcresulttool get
+test-results tests` JSON file, or a directory of bundles or such files,
+so it runs without Xcode (see bin/generate-xcresult-fixture.py).
+
+Usage:
+    python3 bin/parse-xcresult.py                   # latest bundle in DerivedData
+    python3 bin/parse-xcresult.py path/to/Test.xcresult
+    python3 bin/parse-xcresult.py --history 20      # flaky tests over the last 20 bundles
+    python3 bin/parse-xcresult.py --history 20 fixtures/   # ... over saved JSON files
+    python3 bin/parse-xcresult.py --durations --save-durations stress.json
+    python3 bin/parse-xcresult.py --durations --baseline stress.json   # after bin/test.sh -S
+"""
+
+import argparse
+import hashlib
+import heapq
 import json
+import math
 import subprocess
 import sys
 import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
+
+DERIVED_DATA_ROOT = os.path.expanduser("~/Library/Developer/Xcode/DerivedData")
+CACHE_DIR = os.path.expanduser("~/Library/Caches/Peach/parse-xcresult")
+DERIVED_DATA_CACHE = "derived-data.json"
+RESULTS_CACHE_VERSION = 5
+MAX_CACHED_BUNDLES = 200
+
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER = re.compile(r"[-+0-9.eE]*")
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)\s*(ms|h|m|s)\b")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+# Node keys shown in the failure header rather than as details.
+HEADER_KEYS = ("name", "nodeType", "result", "nodeIdentifier", "nodeIdentifierURL")
+
+# Node keys kept on TestNode while its children stream past.
+NODE_ATTRIBUTES = {"name": "name", "nodeType": "node_type",
+                   "nodeIdentifier": "identifier", "result": "result"}
+
+TEST_CASE = "Test Case"
+
+# nodeType -> summary["durations"] group timed by --durations.
+DURATION_GROUPS = {TEST_CASE: "testCases", "Test Suite": "suites"}
+
+# Characters XML 1.0 does not allow, even escaped.
+XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+# Characters an attribute value can't hold as they are.
+XML_SPECIAL = re.compile(r"[\x00-\x1f&<>\"'\ufffe\uffff]")
+
+PERCENTILES = (50, 90, 95, 99)
+DEFAULT_TOP = 20
+DEFAULT_REGRESSION = 0.25
+DEFAULT_MIN_DELTA = 0.1
+
+# One history character per bundle; "." where the test did not run.
+HISTORY_MARKS = {"passed": "P", "expected failure": "P", "failed": "F", "skipped": "S"}
+
+
+class XCResultError(Exception):
+    """xcresulttool failed or its output is not a test results document."""
+
+
+def latest_entries(path, accept, count):
+    """The `count` most recently modified entries of `path` that `accept`
+    returns true for, newest first.
 
+    One scandir pass; DirEntry caches the stat results, so no entry is
+    stat'ed twice, and only the `count` newest are kept and ordered.
+    """
+    with os.scandir(path) as entries:
+        return [entry_path for _, entry_path in heapq.nlargest(count, (
+            (entry.stat().st_mtime, entry.path) for entry in entries
+            if accept(entry)))]
 
-def find_latest_xcresult(derived_data_path):
-    """Find the most recent .xcresult directory in the test logs."""
-    test_log_dir = os.path.join(derived_data_path, "Logs", "Test")
+
+def is_bundle(entry):
+    return entry.name.endswith(".xcresult") and entry.is_dir()
+
+
+def is_saved_results(entry):
+    return entry.name.endswith(".json") and entry.is_file()
+
+
+def find_latest_xcresults(test_log_dir, count=1, saved=False):
+    """Find the most recent .xcresult bundles in a directory, newest first.
+
+    With `saved`, results JSON files saved from bundles count as well.
+    """
     if not os.path.isdir(test_log_dir):
         print(f"Test log directory not found: {test_log_dir}", file=sys.stderr)
         sys.exit(1)
 
-    xcresults = sorted([
-        os.path.join(test_log_dir, d)
-        for d in os.listdir(test_log_dir)
-        if d.endswith(".xcresult") and os.path.isdir(os.path.join(test_log_dir, d))
-    ])
+    accept = (lambda entry: is_bundle(entry) or is_saved_results(entry)) if saved else is_bundle
+    xcresults = latest_entries(test_log_dir, accept, count)
     if not xcresults:
         print("No .xcresult bundles found", file=sys.stderr)
         sys.exit(1)
-    return xcresults[-1]
+    return xcresults
 
 
-def get_test_results(xcresult_path):
-    """Use xcrun xcresulttool to get test results JSON."""
-    result = subprocess.run(
-        ["xcrun", "xcresulttool", "get", "test-results", "tests", "--path", xcresult_path],
-        capture_output=True, text=True
-    )
-    if result.returncode != 0:
-        print(f"xcresulttool error: {result.stderr}", file=sys.stderr)
+def test_log_dir(derived_data_path):
+    return os.path.join(derived_data_path, "Logs", "Test")
+
+
+def load_cache(name):
+    try:
+        with open(os.path.join(CACHE_DIR, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(name, value):
+    """Write a cache file atomically; caching is best effort."""
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=CACHE_DIR, delete=False) as f:
+            json.dump(value, f)
+        os.replace(f.name, path)
+    except OSError:
+        pass
+
+
+def find_derived_data():
+    """Most recently modified Peach-* directory in DerivedData.
+
+    DerivedData holds every project ever built, so the names of the Peach
+    directories are cached until its mtime changes (an entry was added or
+    removed); a warm run only stats those few directories.
+    """
+    try:
+        root_mtime = os.stat(DERIVED_DATA_ROOT).st_mtime
+    except OSError:
+        root_mtime = None
+    cached = load_cache(DERIVED_DATA_CACHE)
+    if (root_mtime is not None and cached and cached.get("root") == DERIVED_DATA_ROOT
+            and cached.get("mtime") == root_mtime):
+        names = cached["names"]
+    else:
+        names = []
+        if root_mtime is not None:
+            with os.scandir(DERIVED_DATA_ROOT) as entries:
+                names = [entry.name for entry in entries
+                         if entry.name.startswith("Peach-") and entry.is_dir()]
+            save_cache(DERIVED_DATA_CACHE,
+                       {"root": DERIVED_DATA_ROOT, "mtime": root_mtime, "names": names})
+
+    latest = None
+    latest_mtime = None
+    for name in names:
+        path = os.path.join(DERIVED_DATA_ROOT, name)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        if latest_mtime is None or mtime > latest_mtime:
+            latest, latest_mtime = path, mtime
+    if not latest:
+        print("No Peach DerivedData directory found", file=sys.stderr)
         sys.exit(1)
-    return json.loads(result.stdout)
+    return latest
+
+
+class JSONStream:
+    """Pull parser over a text stream, for JSON documents too big to load whole.
+
+    The caller walks the structure with peek()/expect() and decodes the
+    values it wants with value(); only the unread tail of the input is
+    buffered.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self, size):
+        chunk = self.f.read(size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or "" at the end of the input."""
+        if self.pos < len(self.buf):
+            char = self.buf[self.pos]
+            if char not in " \t\n\r":
+                return char
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in xcresulttool output, "
+                             f"got {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def flat_object(self):
+        """Decode the object at the current position if nothing is nested in it.
+
+        Returns None, consuming nothing, when the object holds arrays or
+        objects or its end is not buffered yet. Most test nodes are flat
+        leaves, and decoding them in one call is much faster than key by key.
+        """
+        end = self.buf.find("}", self.pos)
+        if end < 0:
+            return None
+        text = self.buf[self.pos:end + 1]
+        if "[" in text or "{" in text[1:]:
+            return None
+        try:
+            # Fails if the "}" was inside a string.
+            value = DECODER.decode(text)
+        except json.JSONDecodeError:
+            return None
+        self.pos = end + 1
+        return value
+
+    def value(self):
+        """Decode the next complete value, reading more input until it fits."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill(size):
+                    size *= 2
+                    continue
+                raise
+            # A number cut off by the end of the buffer ("1." of "1.5") may
+            # still decode; only accept it once a delimiter follows.
+            if (isinstance(value, (int, float))
+                    and NUMBER.match(self.buf, self.pos).end() == len(self.buf)
+                    and self._fill(self.chunk_size)):
+                continue
+            self.pos = end
+            return value
+
+
+class TestNode:
+    """A test node whose children are being streamed."""
+
+    __slots__ = ("name", "parent", "fields", "children", "node_type", "identifier", "result",
+                 "duration", "seconds")
 
+    def __init__(self, parent, name="", fields=None):
+        self.name = name
+        self.parent = parent
+        self.fields = {} if fields is None else fields
+        self.children = 0
+        self.node_type = ""
+        self.identifier = ""
+        self.result = ""
+        self.duration = None
+        self.seconds = None
 
-def collect_all_results(nodes, path=""):
-    """Recursively collect ALL result values from leaf nodes."""
+    def test_case(self):
+        """Identifier of the test case this node is or belongs to, or None."""
+        node = self
+        while node:
+            if node.node_type == TEST_CASE:
+                return node.identifier or node.path()
+            node = node.parent
+        return None
+
+    def path(self):
+        names = []
+        node = self
+        while node:
+            names.append(node.name)
+            node = node.parent
+        return "/".join(reversed(names))
+
+
+def parse_duration(value):
+    """Seconds of an xcresulttool duration such as "0.39s", "1m 2s" or "120ms".
+
+    Numbers (durationInSeconds) pass through; anything else is None.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    parts = DURATION_PART.findall(value.replace(",", "."))
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def stream_summary(f):
+    """Unique leaf result values, failures and test case results of a
+    test-results document.
+
+    Reads the JSON from the text stream `f` in one iterative pass, so
+    neither the document nor its tree is ever held whole and deep suites
+    can't hit the recursion limit. Only the open ancestors of the current
+    node and the failing leaves are materialized; each failure keeps the
+    node keys printed as details. Paths are joined at the end, since a
+    node's name may follow its children.
+
+    Test cases and suites are identified by their nodeIdentifier, or their
+    path if they have none, which is likewise resolved at the end. Test
+    cases are grouped by result, and both get their durations in seconds.
+    """
+    stream = JSONStream(f)
     results = set()
-    for node in nodes:
-        name = node.get("name", "")
-        current_path = f"{path}/{name}" if path else name
-        result = node.get("result", "")
-        children = node.get("children", [])
-
-        if children:
-            results.update(collect_all_results(children, current_path))
+    failing = []
+    # (nodeType, nodeIdentifier or the TestNode to take the path of, result, seconds)
+    recorded = []
+
+    def record(node_type, identifier, result, seconds, duration):
+        recorded.append((node_type, identifier, result,
+                         parse_duration(seconds if seconds is not None else duration)))
+
+    stream.expect("{")
+    while stream.peek() != "}":
+        if stream.peek() == ",":
+            stream.pos += 1
+            continue
+        key = stream.value()
+        stream.expect(":")
+        if key != "testNodes":
+            stream.value()
+            continue
+
+        stream.expect("[")
+        parent = None
+        node = None
+        while True:
+            char = stream.peek()
+            if char == ",":
+                stream.pos += 1
+            elif node is None:
+                # Between the nodes of `parent`'s children array.
+                if char == "]":
+                    stream.pos += 1
+                    if parent is None:
+                        break
+                    node, parent = parent, parent.parent
+                else:
+                    if parent:
+                        parent.children += 1
+                        parent.fields = None
+                    leaf = stream.flat_object()
+                    if leaf is None:
+                        stream.expect("{")
+                        node = TestNode(parent)
+                        continue
+                    result = leaf.get("result", "")
+                    results.add(result)
+                    if result.lower() != "passed":
+                        node = TestNode(parent, leaf.get("name", ""), leaf)
+                        node.node_type = leaf.get("nodeType", "")
+                        node.identifier = leaf.get("nodeIdentifier", "")
+                        failing.append(node)
+                        node = None
+                    node_type = leaf.get("nodeType")
+                    if node_type in DURATION_GROUPS:
+                        identifier = (leaf.get("nodeIdentifier")
+                                      or TestNode(parent, leaf.get("name", "")))
+                        record(node_type, identifier, result,
+                               leaf.get("durationInSeconds"), leaf.get("duration"))
+            elif char == "}":
+                stream.pos += 1
+                if not node.children:
+                    results.add(node.result)
+                    if node.result.lower() != "passed":
+                        failing.append(node)
+                if node.node_type in DURATION_GROUPS:
+                    record(node.node_type, node.identifier or node, node.result,
+                           node.seconds, node.duration)
+                node = None
+            else:
+                key = stream.value()
+                stream.expect(":")
+                if key == "children" and stream.peek() == "[":
+                    stream.pos += 1
+                    parent, node = node, None
+                    continue
+                value = stream.value()
+                if key in NODE_ATTRIBUTES and isinstance(value, str):
+                    setattr(node, NODE_ATTRIBUTES[key], value)
+                elif key == "duration":
+                    node.duration = value
+                elif key == "durationInSeconds":
+                    node.seconds = value
+                if node.fields is not None:
+                    node.fields[key] = value
+    stream.expect("}")
+
+    failures = [{
+        "path": node.path(),
+        "result": node.fields.get("result", ""),
+        "testCase": node.test_case(),
+        "details": {key: val for key, val in node.fields.items() if key not in HEADER_KEYS},
+    } for node in failing]
+    test_cases = {}
+    durations = {group: {} for group in DURATION_GROUPS.values()}
+    for node_type, identifier, result, seconds in recorded:
+        if isinstance(identifier, TestNode):
+            identifier = identifier.path()
+        if node_type == TEST_CASE:
+            test_cases[identifier] = result
+        if seconds is not None:
+            durations[DURATION_GROUPS[node_type]][identifier] = seconds
+    by_result = {}
+    for identifier, result in test_cases.items():
+        by_result.setdefault(result, []).append(identifier)
+    return {"results": sorted(results), "failures": failures, "testCases": by_result,
+            "durations": durations}
+
+
+def get_test_results(xcresult_path):
+    """Stream xcrun xcresulttool's test results JSON into stream_summary().
+
+    A file instead of a bundle is read as that JSON, saved earlier.
+    """
+    if os.path.isfile(xcresult_path):
+        try:
+            with open(xcresult_path) as f:
+                return stream_summary(f)
+        except ValueError as e:
+            raise XCResultError(f"{xcresult_path}: {e}") from None
+    with tempfile.TemporaryFile("w+") as stderr:
+        with subprocess.Popen(
+            ["xcrun", "xcresulttool", "get", "test-results", "tests", "--path", xcresult_path],
+            stdout=subprocess.PIPE, stderr=stderr, text=True
+        ) as proc:
+            error = None
+            try:
+                summary = stream_summary(proc.stdout)
+            except ValueError as e:
+                error = e
+            proc.stdout.read()
+        if proc.returncode != 0 or error:
+            stderr.seek(0)
+            raise XCResultError(stderr.read().strip() or str(error))
+    return summary
+
+
+def bundle_key(xcresult_path):
+    """Cache key of a bundle: its path, mtime and a hash of its Info.plist.
+
+    xcodebuild rewrites Info.plist whenever it writes a bundle, so a bundle
+    reused under the same path gets a new key even within one mtime tick.
+    """
+    path = os.path.abspath(xcresult_path)
+    digest = hashlib.sha256()
+    try:
+        with open(os.path.join(path, "Info.plist"), "rb") as f:
+            digest.update(f.read())
+    except OSError:
+        pass
+    identity = f"{path}\0{os.stat(path).st_mtime_ns}\0{digest.hexdigest()}"
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def prune_cache():
+    """Drop the least recently written results beyond MAX_CACHED_BUNDLES."""
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            cached = [(entry.stat().st_mtime, entry.path) for entry in entries
+                      if entry.name.startswith("results-")]
+    except OSError:
+        return
+    if len(cached) > MAX_CACHED_BUNDLES:
+        cached.sort()
+        for _, path in cached[:len(cached) - MAX_CACHED_BUNDLES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def cached_summary(xcresult_path):
+    """Summary of a bundle parsed before, or None."""
+    try:
+        key = bundle_key(xcresult_path)
+    except OSError:
+        return None
+    cached = load_cache(f"results-{key}.json")
+    if cached and cached.get("version") == RESULTS_CACHE_VERSION:
+        return cached["summary"]
+    return None
+
+
+def parse_summary(xcresult_path):
+    """Summary of a bundle's test results from xcresulttool, cached for next time."""
+    try:
+        summary = get_test_results(xcresult_path)
+        key = bundle_key(xcresult_path)
+    except OSError as e:
+        raise XCResultError(str(e)) from None
+    save_cache(f"results-{key}.json",
+               {"version": RESULTS_CACHE_VERSION, "summary": summary})
+    prune_cache()
+    return summary
+
+
+def load_summary(xcresult_path, use_cache=True):
+    """Summary of a bundle's test results, from the cache when it was parsed before."""
+    return (use_cache and cached_summary(xcresult_path)) or parse_summary(xcresult_path)
+
+
+def parse_bundle(xcresult_path):
+    """Process-pool entry point: parse_summary(), with errors as a message."""
+    try:
+        return parse_summary(xcresult_path), None
+    except XCResultError as e:
+        return None, str(e)
+
+
+def load_summaries(xcresult_paths, use_cache=True, jobs=None):
+    """Summaries of several bundles; uncached ones are parsed in a process pool.
+
+    Returns (path, summary or None, error or None, cached) in the given order.
+    """
+    loaded = {path: cached_summary(path) if use_cache else None for path in xcresult_paths}
+    missing = [path for path, summary in loaded.items() if summary is None]
+    parsed = {}
+    if missing:
+        with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1,
+                                                 len(missing))) as pool:
+            parsed = dict(zip(missing, pool.map(parse_bundle, missing)))
+    bundles = []
+    for path in xcresult_paths:
+        if path in parsed:
+            summary, error = parsed[path]
+            bundles.append((path, summary, error, False))
         else:
-            results.add(result)
+            bundles.append((path, loaded[path], None, True))
+    return bundles
 
-    return results
 
+def test_histories(summaries):
+    """Per test case, its result in each of `summaries` (None where it didn't run)."""
+    histories = {}
+    for k, summary in enumerate(summaries):
+        for result, identifiers in summary["testCases"].items():
+            for identifier in identifiers:
+                histories.setdefault(identifier, [None] * len(summaries))[k] = result
+    return histories
 
-def collect_failures(nodes, path=""):
-    """Recursively find all leaf-level non-Passed nodes."""
-    failures = []
-    for node in nodes:
-        name = node.get("name", "")
-        current_path = f"{path}/{name}" if path else name
-        result = node.get("result", "").lower()
-        children = node.get("children", [])
 
-        if children:
-            failures.extend(collect_failures(children, current_path))
-        elif result != "passed":
-            failures.append({
-                "path": current_path,
-                "result": node.get("result", ""),
-                "node": node
-            })
+def history_marks(history):
+    return "".join("." if result is None else HISTORY_MARKS.get(result.lower(), "?")
+                   for result in history)
 
-    return failures
 
+def bundle_time(xcresult_path):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(os.stat(xcresult_path).st_mtime))
 
-def main():
-    xcresult_path = None
-    for arg in sys.argv[1:]:
-        xcresult_path = arg
-
-    derived_data_root = os.path.expanduser("~/Library/Developer/Xcode/DerivedData")
-    peach_dirs = sorted([
-        os.path.join(derived_data_root, d)
-        for d in os.listdir(derived_data_root)
-        if d.startswith("Peach-") and os.path.isdir(os.path.join(derived_data_root, d))
-    ], key=os.path.getmtime, reverse=True)
-    if not peach_dirs:
-        print("No Peach DerivedData directory found", file=sys.stderr)
-        sys.exit(1)
-    derived_data = peach_dirs[0]
-    if not xcresult_path:
-        xcresult_path = find_latest_xcresult(derived_data)
 
-    print(f"Parsing: {os.path.basename(xcresult_path)}")
-    data = get_test_results(xcresult_path)
+def print_history(bundles):
+    """Report flaky and always-failing tests over `bundles`, oldest first."""
+    print(f"History of {len(bundles)} bundle(s), oldest first:")
+    for k, (path, summary, error, cached) in enumerate(bundles, 1):
+        status = f"error: {error}" if error else ("cached" if cached else "parsed")
+        print(f"  {k:>3}  {bundle_time(path)}  {os.path.basename(path)}  ({status})")
+    parsed = [(k, summary) for k, (_, summary, _, _) in enumerate(bundles, 1) if summary]
+    histories = test_histories([summary for _, summary in parsed])
+    print(f"\n{len(histories)} test case(s) in {len(parsed)} readable bundle(s)")
+
+    flaky = []
+    failing = []
+    for identifier, history in histories.items():
+        marks = history_marks(history)
+        fails = marks.count("F")
+        runs = fails + marks.count("P")
+        if not fails:
+            continue
+        failed_in = [parsed[k][0] for k, mark in enumerate(marks) if mark == "F"]
+        entry = (fails / runs, identifier, marks, failed_in[0], failed_in[-1])
+        (failing if fails == runs else flaky).append(entry)
+
+    if flaky:
+        print(f"\n{len(flaky)} flaky test(s), passed and failed:\n")
+        print("  fail%  history  test")
+        for rate, identifier, marks, first, last in sorted(flaky, key=lambda e: (-e[0], e[1])):
+            print(f"  {rate:>5.0%}  {marks}  {identifier}")
+            print(f"         first failed in #{first} ({bundle_time(bundles[first - 1][0])}), "
+                  f"last in #{last} ({bundle_time(bundles[last - 1][0])})")
+    else:
+        print("\nNo flaky tests.")
+    if failing:
+        print(f"\n{len(failing)} test(s) failed every time they ran:\n")
+        for _, identifier, marks, first, _ in sorted(failing, key=lambda e: e[1]):
+            print(f"  {marks}  {identifier}  (since #{first}, {bundle_time(bundles[first - 1][0])})")
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def load_baseline(path, use_cache=True):
+    """Durations of a baseline: a bundle, a saved results JSON file or a
+    --save-durations file."""
+    if not os.path.isdir(path):
+        with open(path) as f:
+            durations = json.load(f)
+        if "testNodes" not in durations:
+            return durations
+    return load_summary(path, use_cache)["durations"]
+
+
+def duration_regressions(durations, baseline, threshold, min_delta):
+    """(ratio, before, after, identifier) of every test case or suite that got
+    more than `threshold` and `min_delta` seconds slower, slowest change first.
+    """
+    regressions = []
+    for group, timed in durations.items():
+        before = baseline.get(group, {})
+        for identifier, after in timed.items():
+            old = before.get(identifier)
+            if old is None or after - old <= min_delta:
+                continue
+            ratio = after / old - 1 if old else math.inf
+            if ratio > threshold:
+                regressions.append((ratio, old, after, identifier))
+    return sorted(regressions, key=lambda r: (-r[0], r[3]))
 
-    test_nodes = data.get("testNodes", [])
 
+def print_durations(durations, top, baseline=None, threshold=DEFAULT_REGRESSION,
+                    min_delta=DEFAULT_MIN_DELTA):
+    """Print the duration profile of a bundle; returns the number of regressions."""
+    cases = durations["testCases"]
+    ordered = sorted(cases.values())
+    if not ordered:
+        print("No test case durations in this bundle.")
+        return 0
+    print(f"Durations: {len(ordered)} test case(s), {sum(ordered):.2f}s in total")
+    print("  " + "  ".join(f"p{p} {percentile(ordered, p):.3f}s" for p in PERCENTILES)
+          + f"  max {ordered[-1]:.3f}s")
+
+    for group, title in (("testCases", "test cases"), ("suites", "suites")):
+        slowest = heapq.nlargest(top, durations[group].items(), key=lambda item: item[1])
+        if slowest:
+            print(f"\nSlowest {title}:")
+            for identifier, seconds in slowest:
+                print(f"  {seconds:>9.3f}s  {identifier}")
+
+    if baseline is None:
+        return 0
+    regressions = duration_regressions(durations, baseline, threshold, min_delta)
+    added = cases.keys() - baseline.get("testCases", {}).keys()
+    removed = baseline.get("testCases", {}).keys() - cases.keys()
+    print(f"\nAgainst the baseline: {len(regressions)} regression(s) "
+          f"(more than {threshold:.0%} and {min_delta}s slower), "
+          f"{len(added)} new and {len(removed)} missing test case(s)")
+    for ratio, before, after, identifier in regressions:
+        change = f"{ratio:+.0%}" if math.isfinite(ratio) else "new time"
+        print(f"  {change:>6}  {before:.3f}s -> {after:.3f}s  {identifier}")
+    return len(regressions)
+
+
+def write_text(summary, xcresult_path, out):
     # Show all unique result values
-    all_results = collect_all_results(test_nodes)
-    print(f"Unique result values: {all_results}")
+    out.write(f"Unique result values: {set(summary['results'])}\n")
 
-    failures = collect_failures(test_nodes)
+    failures = summary["failures"]
 
     if not failures:
-        print("All tests passed.")
+        out.write("All tests passed.\n")
         return
 
-    print(f"\n{len(failures)} non-passing test(s):\n")
+    out.write(f"\n{len(failures)} non-passing test(s):\n\n")
     for f in failures:
-        print(f"  [{f['result']}] {f['path']}")
-        node = f["node"]
-        for key, val in node.items():
-            if key in ("name", "nodeType", "result", "nodeIdentifier", "nodeIdentifierURL"):
-                continue
+        out.write(f"  [{f['result']}] {f['path']}\n")
+        for key, val in f["details"].items():
             if isinstance(val, str):
-                print(f"    {key}: {val}")
+                out.write(f"    {key}: {val}\n")
             elif isinstance(val, list):
                 for item in val:
-                    print(f"    {key}: {json.dumps(item)[:400]}")
+                    out.write(f"    {key}: {json.dumps(item)[:400]}\n")
             elif isinstance(val, dict):
-                print(f"    {key}: {json.dumps(val)[:400]}")
-        print()
+                out.write(f"    {key}: {json.dumps(val)[:400]}\n")
+        out.write("\n")
+
+
+def write_json(summary, xcresult_path, out):
+    """One JSON document with every failure in full, written a failure at a time."""
+    counts = {result: len(identifiers) for result, identifiers in summary["testCases"].items()}
+    out.write(f'{{"bundle": {json.dumps(os.path.abspath(xcresult_path))}, '
+              f'"results": {json.dumps(summary["results"])}, '
+              f'"testCases": {json.dumps(counts)}, "failures": [')
+    for k, failure in enumerate(summary["failures"]):
+        out.write(",\n  " if k else "\n  ")
+        out.write(json.dumps(failure))
+    out.write("\n]}\n" if summary["failures"] else "]}\n")
+
+
+def xml_text(value):
+    return escape(XML_INVALID.sub("\ufffd", value))
+
+
+def xml_attr(value):
+    if not XML_SPECIAL.search(value):
+        return f'"{value}"'
+    return quoteattr(XML_INVALID.sub("\ufffd", value))
+
+
+def junit_testcase(identifier, result, seconds, failures, out):
+    """One <testcase>; a failed one gets a <failure> per non-passing leaf."""
+    classname, _, name = identifier.rpartition("/")
+    attrs = f"classname={xml_attr(classname)} name={xml_attr(name)}"
+    if seconds is not None:
+        attrs += f' time="{seconds:.3f}"'
+    outcome = result.lower()
+    if outcome == "skipped":
+        out.write(f"    <testcase {attrs}>\n"
+                  f"      <skipped message={xml_attr(result)}/>\n"
+                  f"    </testcase>\n")
+    elif outcome == "failed":
+        out.write(f"    <testcase {attrs}>\n")
+        for failure in failures or [{"path": identifier, "result": result, "details": {}}]:
+            # Leaves below a test case are its failure messages.
+            message = failure["path"].rpartition("/")[2]
+            if message == name:
+                message = failure["result"]
+            details = "\n".join(f"{key}: {val if isinstance(val, str) else json.dumps(val)}"
+                                for key, val in failure["details"].items())
+            out.write(f"      <failure message={xml_attr(message)} "
+                      f"type={xml_attr(failure['result'])}>{xml_text(details)}</failure>\n")
+        out.write("    </testcase>\n")
+    else:
+        out.write(f"    <testcase {attrs}/>\n")
+
+
+def write_junit(summary, xcresult_path, out):
+    """JUnit XML with one testcase per test case, written a test case at a time.
+
+    Failures are attached to their test case; non-passing leaves outside
+    any test case become test cases of their own.
+    """
+    by_test_case = {}
+    orphans = []
+    for failure in summary["failures"]:
+        if failure["testCase"]:
+            by_test_case.setdefault(failure["testCase"], []).append(failure)
+        else:
+            orphans.append(failure)
+    test_cases = summary["testCases"]
+    seconds = summary["durations"]["testCases"]
+    counts = {}
+    for result, identifiers in test_cases.items():
+        counts[result.lower()] = counts.get(result.lower(), 0) + len(identifiers)
+    for failure in orphans:
+        counts[failure["result"].lower()] = counts.get(failure["result"].lower(), 0) + 1
+    totals = (f'tests="{sum(counts.values())}" failures="{counts.get("failed", 0)}" '
+              f'skipped="{counts.get("skipped", 0)}" time="{sum(seconds.values()):.3f}"')
+    name = xml_attr(os.path.basename(xcresult_path))
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write(f"<testsuites name={name} {totals}>\n")
+    out.write(f"  <testsuite name={name} {totals}>\n")
+    for result, identifiers in test_cases.items():
+        for identifier in identifiers:
+            junit_testcase(identifier, result, seconds.get(identifier),
+                           by_test_case.get(identifier), out)
+    for failure in orphans:
+        junit_testcase(failure["path"], failure["result"], None, [failure], out)
+    out.write("  </testsuite>\n</testsuites>\n")
+
+
+FORMATS = {"text": write_text, "json": write_json, "junit": write_junit}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parse xcresult bundle and print failed test details with failure messages.")
+    parser.add_argument("xcresult", nargs="?",
+                        help="Bundle or saved xcresulttool JSON to parse, or a directory "
+                             "of them to take the latest from (default: DerivedData's "
+                             "test logs)")
+    parser.add_argument("--format", choices=list(FORMATS), default="text",
+                        help="Failure report format (default: text); json and junit "
+                             "include every failure in full")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-run xcresulttool even if this bundle was parsed before")
+    parser.add_argument("--history", type=int, metavar="N",
+                        help="Report flaky tests over the N most recent bundles in the "
+                             "directory")
+    parser.add_argument("--jobs", type=int,
+                        help="Parallel xcresulttool runs for --history (default: CPU count)")
+    parser.add_argument("--durations", action="store_true",
+                        help="Profile test case and suite durations instead of failures")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help=f"Slowest entries listed by --durations (default: {DEFAULT_TOP})")
+    parser.add_argument("--baseline",
+                        help="Bundle or --save-durations file to compare --durations with; "
+                             "exits 1 on regressions")
+    parser.add_argument("--regression", type=float, default=DEFAULT_REGRESSION,
+                        help="Slowdown flagged against --baseline "
+                             f"(default: {DEFAULT_REGRESSION})")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Ignore slowdowns of fewer seconds "
+                             f"(default: {DEFAULT_MIN_DELTA})")
+    parser.add_argument("--save-durations", metavar="FILE",
+                        help="Write the bundle's durations to FILE for a later --baseline")
+    args = parser.parse_args()
+
+    if args.format != "text" and (args.history is not None or args.durations):
+        parser.error("--format applies to the failure report, not --history or --durations")
+    source = args.xcresult
+    if source and (not os.path.isdir(source) or source.rstrip("/").endswith(".xcresult")):
+        if args.history is not None:
+            parser.error("--history takes a directory of bundles, not a single bundle")
+        xcresult_path = source
+    else:
+        directory = source or test_log_dir(find_derived_data())
+        # Saved results JSON is only looked for in a directory given by hand.
+        saved = source is not None
+        if args.history is not None:
+            if args.history < 1:
+                parser.error("--history must be at least 1")
+            xcresults = find_latest_xcresults(directory, args.history, saved)
+            print_history(load_summaries(xcresults[::-1], use_cache=not args.no_cache,
+                                         jobs=args.jobs))
+            return
+        xcresult_path = find_latest_xcresults(directory, saved=saved)[0]
+
+    if args.format == "text":
+        print(f"Parsing: {os.path.basename(xcresult_path)}", flush=True)
+    try:
+        summary = load_summary(xcresult_path, use_cache=not args.no_cache)
+    except XCResultError as e:
+        print(f"xcresulttool error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.save_durations:
+        with open(args.save_durations, "w") as f:
+            json.dump(summary["durations"], f, indent=2)
+            f.write("\n")
+    if args.durations:
+        baseline = None
+        if args.baseline:
+            try:
+                baseline = load_baseline(args.baseline, use_cache=not args.no_cache)
+            except (OSError, ValueError, XCResultError) as e:
+                print(f"Baseline {args.baseline}: {e}", file=sys.stderr)
+                sys.exit(1)
+        if print_durations(summary["durations"], args.top, baseline,
+                           args.regression, args.min_delta):
+            sys.exit(1)
+        return
+
+    FORMATS[args.format](summary, xcresult_path, sys.stdout)
 
 
 if __name__ == "__main__":
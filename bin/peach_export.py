@@ -0,0 +1,148 @@
+"""Constants and lookup tables for the Peach CSV export format.
+
+Shared by the scripts in bin/ that write or read `peach-export-format:1`
+files. Scripts run from bin/ can simply `import peach_export`.
+
+Mirrors Peach/Core/Data/CSVExportSchema.swift and the Interval enum.
+"""
+
+import calendar
+import csv
+import gzip
+import io
+import time
+from functools import lru_cache
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+METADATA_PREFIX = "# peach-export-format:"
+METADATA_LINE = METADATA_PREFIX + "1"
+
+HEADER = [
+    "trainingType", "timestamp",
+    "referenceNote", "referenceNoteName",
+    "targetNote", "targetNoteName",
+    "interval", "tuningSystem",
+    "centOffset", "isCorrect",
+    "initialCentOffset", "userCentError",
+]
+
+NOTE_NAMES = [
+    "C", "C#", "D", "D#", "E", "F",
+    "F#", "G", "G#", "A", "A#", "B",
+]
+
+INTERVALS = {
+    0: "P1", 1: "m2", 2: "M2", 3: "m3", 4: "M3", 5: "P4",
+    6: "d5", 7: "P5", 8: "m6", 9: "M6", 10: "m7", 11: "M7", 12: "P8",
+}
+
+NON_UNISON_SEMITONES = [s for s in INTERVALS if s != 0]
+
+SEMITONES = {abbrev: s for s, abbrev in INTERVALS.items()}
+
+TRAINING_TYPES = ["pitchDiscrimination", "pitchMatching"]
+
+TUNING_SYSTEMS = ["equalTemperament", "justIntonation"]
+
+# Training disciplines as named by generate-test-data.py's flags.
+DISCIPLINES = [
+    "discrimination-unison", "discrimination-interval",
+    "matching-unison", "matching-interval",
+]
+
+
+def midi_name(note: int) -> str:
+    octave = note // 12 - 1
+    return f"{NOTE_NAMES[note % 12]}{octave}"
+
+
+def record_discipline(training_type: str, interval: str) -> str:
+    """DISCIPLINES entry for a record's trainingType and interval columns."""
+    kind = "discrimination" if training_type == "pitchDiscrimination" else "matching"
+    return f"{kind}-{'unison' if interval == 'P1' else 'interval'}"
+
+
+def csv_preamble() -> str:
+    """Metadata line and header row, exactly as csv.writer emits them."""
+    out = io.StringIO(newline="")
+    out.write(METADATA_LINE + "\n")
+    csv.writer(out).writerow(HEADER)
+    return out.getvalue()
+
+
+def open_export(path: str):
+    """Open an export file as text for csv.reader; .gz and .zst are decompressed.
+
+    Undecodable bytes become U+FFFD instead of raising, so readers can report
+    them as row errors.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="", errors="replace")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"reading {path} requires zstandard (pip install zstandard)")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"),
+                                                            read_across_frames=True)
+        return io.TextIOWrapper(reader, newline="", errors="replace")
+    return open(path, newline="", errors="replace")
+
+
+def interval_target(ref: int, semitones: int) -> int:
+    """Target note `semitones` above `ref`, folded below it past MIDI 127."""
+    target = ref + semitones
+    if target > 127:
+        target = ref - semitones
+    return target
+
+
+@lru_cache(maxsize=1024)
+def _day_prefix(day: int) -> str:
+    return time.strftime("%Y-%m-%dT", time.gmtime(day * 86400))
+
+
+def iso_timestamp(epoch_seconds: int) -> str:
+    """Format integer epoch seconds as `%Y-%m-%dT%H:%M:%SZ` in UTC.
+
+    Only the date part goes through strftime, once per day; the time of day
+    is plain arithmetic.
+    """
+    day, seconds = divmod(epoch_seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{_day_prefix(day)}{hours:02d}:{minutes:02d}:{seconds:02d}Z"
+
+
+@lru_cache(maxsize=1024)
+def _day_epoch(prefix: str) -> int:
+    return calendar.timegm(time.strptime(prefix, "%Y-%m-%dT"))
+
+
+def parse_iso_timestamp(value: str) -> int:
+    """Inverse of iso_timestamp(); raises ValueError for any other format."""
+    if (len(value) != 20 or value[13] != ":" or value[16] != ":" or value[19] != "Z"
+            or not (value[11:13] + value[14:16] + value[17:19]).isdigit()):
+        raise ValueError(f"not a %Y-%m-%dT%H:%M:%SZ timestamp: {value!r}")
+    hours, minutes, seconds = int(value[11:13]), int(value[14:16]), int(value[17:19])
+    if hours > 23 or minutes > 59 or seconds > 59:
+        raise ValueError(f"time of day out of range: {value!r}")
+    return _day_epoch(value[:11]) + hours * 3600 + minutes * 60 + seconds
+
+
+# --- Lookup tables, indexed by MIDI note 0-127 ---
+
+# str(note), as written to the referenceNote/targetNote columns.
+NOTE_NUMBER_TABLE = tuple(str(note) for note in range(128))
+
+# midi_name(note), as written to the referenceNoteName/targetNoteName columns.
+NOTE_NAME_TABLE = tuple(midi_name(note) for note in range(128))
+
+# For each reference note, one (interval abbreviation, target note) pair per
+# entry of NON_UNISON_SEMITONES, in the same order.
+INTERVAL_TARGETS = tuple(
+    tuple((INTERVALS[s], interval_target(ref, s)) for s in NON_UNISON_SEMITONES)
+    for ref in range(128)
+)